@@ -1,78 +1,128 @@
 #!/usr/bin/env python3
-import sys
+import argparse
 import numpy as np
 import os
 
-def read_xyz(filename):
-    with open(filename) as f:
-        lines = f.readlines()
-    natoms = int(lines[0])
-    symbols = []
-    coords = []
-    for line in lines[2:2+natoms]:
-        parts = line.strip().split()
-        symbols.append(parts[0])
-        coords.append([float(x) for x in parts[1:4]])
-    return np.array(symbols), np.array(coords)
-
-def write_xyz(filename, symbols, coords):
-    with open(filename, 'w') as f:
-        f.write(f"{len(symbols)}\nAligned to XY plane, NH along Y axis\n")
-        for s, (x, y, z) in zip(symbols, coords):
-            f.write(f"{s} {x:.6f} {y:.6f} {z:.6f}\n")
+from bonds import bond_pairs, reference_atoms
+from xyz_io import read_xyz, write_xyz
+
+def rotation_matrices(axes, angles):
+    """Rodrigues rotation matrices (n, 3, 3) for n axes (n, 3) and angles (n,)."""
+    axes = np.asarray(axes, dtype=float)
+    axes = axes / np.linalg.norm(axes, axis=-1, keepdims=True)
+    x, y, z = axes[:, 0], axes[:, 1], axes[:, 2]
+    zero = np.zeros_like(x)
+    K = np.stack([
+        np.stack([zero, -z, y], axis=-1),
+        np.stack([z, zero, -x], axis=-1),
+        np.stack([-y, x, zero], axis=-1),
+    ], axis=1)
+    sin = np.sin(angles)[:, None, None]
+    cos = np.cos(angles)[:, None, None]
+    return np.eye(3) + sin * K + (1 - cos) * (K @ K)
 
 def rotate(coords, axis, angle):
-    axis = axis / np.linalg.norm(axis)
-    K = np.array([[0, -axis[2], axis[1]],
-                  [axis[2], 0, -axis[0]],
-                  [-axis[1], axis[0], 0]])
-    R = np.eye(3) + np.sin(angle) * K + (1 - np.cos(angle)) * (K @ K)
+    R = rotation_matrices([axis], [angle])[0]
     return coords @ R.T
 
-def align_molecule(symbols, coords):
-    # === customize if needed ===
-    ring_indices = [0, 1, 2, 3, 4, 5]  # pyridine ring atoms
-    nh_indices = [0, 6]               # N and H atoms of N–H bond
+def align_frames(frames, ring_indices, nh_indices):
+    """
+    Align a stack of frames (nframes, natoms, 3) in one pass: one stacked
+    SVD for all ring normals, one batch of rotation matrices per step and
+    a single einsum to apply them. `nh_indices` are the X and H atoms of
+    the bond that is turned onto the Y axis.
+    """
+    frames = np.asarray(frames, dtype=float)
+    nframes = len(frames)
 
     # Step 1: align ring to XY plane
-    ring_coords = coords[ring_indices]
-    ring_centered = ring_coords - ring_coords.mean(axis=0)
+    ring_coords = frames[:, ring_indices]
+    ring_centered = ring_coords - ring_coords.mean(axis=1, keepdims=True)
     _, _, vh = np.linalg.svd(ring_centered)
-    normal = vh[2]
+    normal = vh[:, 2]
 
     z_axis = np.array([0, 0, 1])
     cross1 = np.cross(normal, z_axis)
-    if np.linalg.norm(cross1) > 1e-6:
-        angle1 = np.arccos(np.clip(np.dot(normal, z_axis), -1, 1))
-        coords = rotate(coords, cross1, angle1)
+    tilted = np.linalg.norm(cross1, axis=1) > 1e-6
+    angle1 = np.where(tilted, np.arccos(np.clip(normal @ z_axis, -1, 1)), 0.0)
+    R1 = rotation_matrices(np.where(tilted[:, None], cross1, z_axis), angle1)
 
     # Step 2: align NH vector to Y-axis
-    n = coords[nh_indices[0]]
-    h = coords[nh_indices[1]]
-    nh = h - n
-    nh[2] = 0  # project to XY
-    nh /= np.linalg.norm(nh)
+    nh = np.einsum("fij,fj->fi", R1, frames[:, nh_indices[1]] - frames[:, nh_indices[0]])
+    nh[:, 2] = 0  # project to XY
+    nh /= np.linalg.norm(nh, axis=1, keepdims=True)
 
     y_axis = np.array([0, 1, 0])
     cross2 = np.cross(nh, y_axis)
-    angle2 = np.arccos(np.clip(np.dot(nh, y_axis), -1, 1))
-    sign2 = np.sign(cross2[2]) if abs(cross2[2]) > 1e-8 else 1.0
-    coords = rotate(coords, [0, 0, 1], sign2 * angle2)
+    angle2 = np.arccos(np.clip(nh @ y_axis, -1, 1))
+    sign2 = np.where(np.abs(cross2[:, 2]) > 1e-8, np.sign(cross2[:, 2]), 1.0)
+    R2 = rotation_matrices(np.tile(z_axis, (nframes, 1)), sign2 * angle2)
+
+    return np.einsum("fij,faj->fai", R2 @ R1, frames)
+
+def align_molecule(symbols, coords):
+    ring_indices, nh_indices = reference_atoms(symbols, coords)
+    return align_frames(coords[None], ring_indices, nh_indices)[0]
 
-    return coords
+def parse_indices(text):
+    """1-based "1,2,3" into 0-based indices."""
+    return [int(v) - 1 for v in text.split(",")]
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: ./align_pyridine_xyz.py input.xyz")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Align molecules: ring in the XY plane, X–H bond along the Y axis")
+    parser.add_argument("xyz_files", nargs="+",
+                        help="XYZ files; the frames of all files that share reference atoms are aligned in one batch")
+    parser.add_argument("-o", "--output",
+                        help="Write all aligned frames to this one file instead of aligned_<name>.xyz per input")
+    parser.add_argument("--ring", help="1-based ring atoms, e.g. 1,2,3,4,5,6 (default: perceived from the bonds of each molecule)")
+    parser.add_argument("--xh", help="1-based X and H atoms of the bond put on the Y axis, e.g. 1,7 (default: perceived)")
+    args = parser.parse_args()
+
+    inputs = [read_xyz(f) for f in args.xyz_files]
+    if args.output and len({len(symbols) for symbols, _, _ in inputs}) > 1:
+        print("❌ All input files must contain the same molecule to be written to one file")
+        return
+
+    # the reference atoms are perceived once per molecule: the same elements bonded the same way
+    references, perceived = [], {}
+    for input_file, (symbols, frames, _) in zip(args.xyz_files, inputs):
+        if args.ring and args.xh:
+            references.append((parse_indices(args.ring), parse_indices(args.xh)))
+            continue
+        pairs = bond_pairs(symbols, frames[0])
+        key = (tuple(symbols), pairs.tobytes())
+        if key not in perceived:
+            ring_indices, nh_indices = reference_atoms(symbols, frames[0], pairs)
+            ring_indices = parse_indices(args.ring) if args.ring else ring_indices
+            nh_indices = parse_indices(args.xh) if args.xh else nh_indices
+            perceived[key] = ring_indices, nh_indices
+            x, h = nh_indices
+            print(f"🔎 {input_file}: ring {'-'.join(f'{symbols[i]}{i + 1}' for i in ring_indices)}, "
+                  f"bond {symbols[x]}{x + 1}–{symbols[h]}{h + 1}")
+        references.append(perceived[key])
+
+    # all frames sharing a size and reference atoms are aligned in one batch, then split per file
+    batches = {}
+    for i, (symbols, frames, _) in enumerate(inputs):
+        ring_indices, nh_indices = references[i]
+        batches.setdefault((len(symbols), tuple(ring_indices), tuple(nh_indices)), []).append(i)
+    aligned = [None] * len(inputs)
+    for (_, ring_indices, nh_indices), members in batches.items():
+        stack = align_frames(np.concatenate([inputs[i][1] for i in members]), list(ring_indices), list(nh_indices))
+        counts = [len(inputs[i][1]) for i in members]
+        for i, frames in zip(members, np.split(stack, np.cumsum(counts)[:-1])):
+            aligned[i] = frames
+    comment = "Aligned to XY plane, XH along Y axis"
 
-    input_file = sys.argv[1]
-    output_file = f"aligned_{os.path.basename(input_file)}"
+    if args.output:
+        write_xyz(args.output, inputs[0][0], np.concatenate(aligned), comment)
+        print(f"Aligned XYZ written to: {args.output}")
+        return
 
-    symbols, coords = read_xyz(input_file)
-    aligned_coords = align_molecule(symbols, coords)
-    write_xyz(output_file, symbols, aligned_coords)
-    print(f"Aligned XYZ written to: {output_file}")
+    for input_file, (symbols, _, _), frames in zip(args.xyz_files, inputs, aligned):
+        output_file = f"aligned_{os.path.basename(input_file)}"
+        write_xyz(output_file, symbols, frames, comment)
+        print(f"Aligned XYZ written to: {output_file}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,101 @@
+"""
+Near-duplicate detection for conformer sets in roughly linear time.
+
+Every geometry gets a rotation- and translation-invariant fingerprint, its
+sorted interatomic distances. Fingerprints are hashed with p-stable
+locality-sensitive hashing (random projections cut into buckets of a fixed
+width, over several independent tables), so geometries that are close end
+up in a shared bucket with high probability. The exact best-fit RMSD is
+only computed between members of the same bucket.
+"""
+import numpy as np
+
+from rmsd import centered, qcp_rmsd
+
+
+def distance_fingerprints(frames):
+    """Sorted interatomic distances, one row per frame."""
+    frames = np.asarray(frames, dtype=float)
+    i, j = np.triu_indices(frames.shape[1], k=1)
+    return np.sort(np.linalg.norm(frames[:, i] - frames[:, j], axis=-1), axis=1)
+
+
+def lsh_projections(frames, projections=4, tables=8, seed=0, chunk=1024):
+    """
+    Random Gaussian projections of the fingerprints, (nframes, tables *
+    projections). Fingerprints are built and projected a chunk of frames
+    at a time, so the full fingerprint matrix never exists.
+    """
+    rng = np.random.default_rng(seed)
+    natoms = np.shape(frames)[1]
+    directions = rng.normal(size=(natoms * (natoms - 1) // 2, tables * projections))
+    return np.concatenate([distance_fingerprints(frames[first:first + chunk]) @ directions
+                           for first in range(0, len(frames), chunk)])
+
+
+def calibrate_width(frames, threshold, samples=32, seed=0):
+    """
+    Bucket width for near_duplicates(): four times the 90th percentile of
+    how far a fingerprint moves when a sample of frames is displaced by
+    random noise of `threshold` RMSD. With 4 projections per table and 8
+    tables, pairs that close share a bucket with probability above 98%.
+    """
+    rng = np.random.default_rng(seed)
+    frames = np.asarray(frames, dtype=float)
+    sample = frames[rng.choice(len(frames), min(samples, len(frames)), replace=False)]
+    noisy = sample + rng.normal(scale=threshold / np.sqrt(3), size=sample.shape)
+    shift = np.linalg.norm(distance_fingerprints(noisy) - distance_fingerprints(sample), axis=1)
+    return 4.0 * max(np.percentile(shift, 90), 1e-6)
+
+
+def lsh_buckets(projected, width, tables=8, seed=0):
+    """
+    Groups of frame indices that share a bucket in at least one hash table,
+    from the output of lsh_projections().
+    """
+    rng = np.random.default_rng(seed)
+    n = len(projected)
+    keys = np.floor((projected + rng.uniform(0, width, size=projected.shape[1])) / width).astype(np.int64)
+    buckets = []
+    for table in keys.reshape(n, tables, -1).transpose(1, 0, 2):
+        _, bucket, counts = np.unique(table, axis=0, return_inverse=True, return_counts=True)
+        order = np.argsort(bucket.ravel(), kind="stable")
+        for group in np.split(order, np.cumsum(counts)[:-1]):
+            if len(group) > 1:
+                buckets.append(group)
+    return buckets
+
+
+def near_duplicates(frames, threshold=0.125, order=None, mask=None, width=None, tables=8, block=256):
+    """
+    Indices of the frames to keep: walking through `order` (for example by
+    increasing energy), a frame is dropped when a frame already kept lies
+    within `threshold` Angstrom RMSD of it. Only pairs that share an LSH
+    bucket are compared. The bucket width is calibrated from the frames
+    unless given.
+    """
+    fit = centered(frames, mask)
+    n = len(fit)
+    order = np.arange(n) if order is None else np.asarray(order)
+    if width is None:
+        width = calibrate_width(fit, threshold)
+
+    neighbours = [[] for _ in range(n)]
+    seen = set()
+    for group in lsh_buckets(lsh_projections(fit, tables=tables), width, tables):
+        # large buckets are compared in strips to bound the memory
+        for first in range(0, len(group), block):
+            rows = group[first:first + block]
+            rmsd = qcp_rmsd(fit[rows], fit[group[first:]])
+            for a, b in zip(*np.nonzero(np.triu(rmsd <= threshold, k=1))):
+                pair = (rows[a], group[first + b])
+                if pair not in seen:
+                    seen.add(pair)
+                    neighbours[pair[0]].append(pair[1])
+                    neighbours[pair[1]].append(pair[0])
+
+    kept = np.zeros(n, dtype=bool)
+    for i in order:
+        if not any(kept[j] for j in neighbours[i]):
+            kept[i] = True
+    return np.flatnonzero(kept)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+import argparse
+import os
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from harvest import harvest_logs, walk_logs
+from log_cache import open_cache
+from spectra import backends, broaden_stack, shapes
+from thermo import HARTREE_TO_KCAL, boltzmann_weights
+
+def harvest_ir_ensemble(files, cache=None, jobs=None):
+    """
+    IR sticks and final Gibbs energies of every log, parsed in parallel.
+    The IR block comes before the thermochemistry in an ORCA log, so each
+    file is only scanned from its last IR SPECTRUM on.
+
+    Returns (names, frequencies, intensities, energies, errors).
+    """
+    logs, errors = harvest_logs(files, cache, start="IR SPECTRUM", jobs=jobs)
+    names, frequencies, intensities, energies = [], [], [], []
+    for f, log in zip(files, logs):
+        if log is None:
+            continue
+        if not log["IR Frequencies"]:
+            errors.append((f, "no IR SPECTRUM block"))
+            continue
+        if log["G(final)"] is None:
+            errors.append((f, "no final Gibbs free energy"))
+            continue
+        names.append(f)
+        frequencies.append(log["IR Frequencies"])
+        intensities.append(log["IR Intensities"])
+        energies.append(log["G(final)"])
+    return names, frequencies, intensities, np.array(energies), errors
+
+def plot_spectrum(x, y, title, output):
+    plt.figure(figsize=(6, 4))
+    plt.plot(x, y, color='black', linewidth=1.5)
+    plt.xlabel("Wavenumber (cm⁻¹)")
+    plt.ylabel("IR Intensity (km/mol)")
+    plt.title(title)
+    plt.grid(True, linestyle=':', alpha=0.5)
+    plt.tight_layout()
+    plt.savefig(output)
+    plt.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Boltzmann-weighted IR spectrum of a conformer ensemble of ORCA frequency jobs")
+    parser.add_argument("logs", nargs="*", help="ORCA log files of the conformers (default: all .log files in the current directory)")
+    parser.add_argument("-o", "--output", default="ensemble_spectrum.png", help="Output image file (default: ensemble_spectrum.png)")
+    parser.add_argument("--save", help="Save the grid, the per-conformer spectra (conformers x grid), the weights "
+                                       "and the ensemble spectrum as .npz (default: output name with .npz)")
+    parser.add_argument("--title", help="Custom title for the plot")
+    parser.add_argument("-T", "--temperature", type=float, default=298.15, help="Temperature for the populations in K (default: 298.15)")
+    parser.add_argument("--fwhm", type=float, default=20.0, help="FWHM of the line shape (cm⁻¹)")
+    parser.add_argument("--shape", choices=shapes, default="gaussian", help="Line shape (default: gaussian)")
+    parser.add_argument("--backend", choices=backends, default="auto", help="Broadening backend (default: auto)")
+    parser.add_argument("--resolution", type=float, default=0.5, help="Grid spacing in cm⁻¹ (default: 0.5)")
+    parser.add_argument("--xmin", type=float, default=0.0, help="Grid start in cm⁻¹ (default: 0)")
+    parser.add_argument("--xmax", type=float, default=4000.0, help="Grid end in cm⁻¹ (default: 4000)")
+    parser.add_argument("-j", "--jobs", type=int, help="Number of parser processes (default: all available cores)")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every log again instead of using the results cache")
+    args = parser.parse_args()
+
+    files = args.logs or walk_logs(".", recursive=False)
+    if not files:
+        print("❌ No .log files found.")
+        return
+
+    cache = None if args.no_cache else open_cache()
+    names, frequencies, intensities, energies, errors = harvest_ir_ensemble(files, cache, args.jobs)
+    if not names:
+        print("❌ No logs with both an IR spectrum and a Gibbs free energy found.")
+        return
+
+    weights = boltzmann_weights(energies, args.temperature)
+    x = np.arange(args.xmin, args.xmax, args.resolution)
+    spectra = broaden_stack(x, frequencies, intensities, args.shape, args.fwhm, backend=args.backend)
+    ensemble = weights @ spectra
+
+    print("\t".join(["File", "ΔG (kcal/mol)", "Population"]))
+    for i in np.argsort(-weights, kind="stable"):
+        relative = (energies[i] - energies.min()) * HARTREE_TO_KCAL
+        print(f"{os.path.basename(names[i])}\t{relative:.3f}\t{weights[i]:.4f}")
+
+    save = args.save or os.path.splitext(args.output)[0] + ".npz"
+    np.savez(save, grid=x, spectra=spectra, weights=weights, ensemble=ensemble,
+             energies=energies, files=np.array(names))
+
+    title = args.title or f"Boltzmann-weighted IR spectrum ({len(names)} conformers, {args.temperature:g} K)"
+    plot_spectrum(x, ensemble, title, args.output)
+    print(f"✅ Saved ensemble spectrum to {args.output} and {len(names)} conformer spectra to {save}")
+
+    if errors:
+        print(f"\n⚠️ Skipped {len(errors)} file(s):")
+        for f, message in errors:
+            print(f"  {f}: {message}")
+
+if __name__ == "__main__":
+    main()
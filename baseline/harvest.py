@@ -0,0 +1,101 @@
+"""
+Recursive discovery and parallel parsing of ORCA logs.
+
+Logs are found with os.scandir and parsed in a process pool sized to the
+cores this process may run on. Results come back in the order of the input
+paths no matter which worker finishes first, and files that fail to parse
+are collected instead of aborting the harvest.
+"""
+import fnmatch
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from log_cache import cache_lookup, cache_store, scan_unchanged
+from orca_log import compressed_suffixes
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def matches(name, pattern):
+    if fnmatch.fnmatch(name, pattern):
+        return True
+    stem, ext = os.path.splitext(name)
+    return ext in compressed_suffixes and fnmatch.fnmatch(stem, pattern)
+
+
+def walk_logs(root=".", pattern="*.log", recursive=True):
+    """
+    Sorted paths of all files under `root` whose name matches `pattern`,
+    with or without a compression suffix such as .gz or .zst.
+    """
+    found = []
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(entry.path)
+                elif matches(entry.name, pattern) and entry.is_file():
+                    found.append(os.path.normpath(entry.path))
+    return sorted(found, key=lambda p: p.split(os.sep))
+
+
+def _scan_job(job):
+    filename, start = job
+    try:
+        return True, scan_unchanged(filename, start)
+    except Exception as e:
+        return False, f"{type(e).__name__}: {e}"
+
+
+def harvest_logs(filenames, cache=None, start=None, jobs=None):
+    """
+    Parse every log with scan_log(start=start), reusing and filling `cache`.
+
+    Returns (results, errors): results holds one dict per file in input order
+    (None for files that failed) and errors holds (filename, message) pairs.
+    """
+    results = [None] * len(filenames)
+    errors = []
+
+    todo = []
+    for i, filename in enumerate(filenames):
+        try:
+            cached = cache_lookup(cache, filename, start) if cache is not None else None
+        except OSError as e:
+            errors.append((i, f"{type(e).__name__}: {e}"))
+            continue
+        if cached is not None:
+            results[i] = cached
+        else:
+            todo.append(i)
+
+    jobs = min(jobs or available_cores(), len(todo))
+    work = [(filenames[i], start) for i in todo]
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            outcomes = list(pool.map(_scan_job, work, chunksize=max(1, len(work) // (jobs * 4))))
+    else:
+        outcomes = [_scan_job(job) for job in work]
+
+    for i, (ok, outcome) in zip(todo, outcomes):
+        if not ok:
+            errors.append((i, outcome))
+            continue
+        identity, result = outcome
+        results[i] = result
+        if cache is not None and identity is not None:
+            cache_store(cache, filenames[i], start, identity, result)
+
+    if cache is not None:
+        cache.commit()
+
+    errors = [(filenames[i], message) for i, message in sorted(errors)]
+    return results, errors
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+import argparse
+import os
+
+from binary_xyz import write_xyzb
+from trajectory import extract_trajectory, write_trajectory_npz, write_trajectory_xyz
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract every geometry step of an optimization log")
+    parser.add_argument("logfile", help="ORCA or Psi4 output file")
+    parser.add_argument("-o", "--output",
+                        help="Output file; .npz writes symbols, coordinates and energies as arrays, "
+                             ".xyzb the binary trajectory format (default: <log>_traj.xyz)")
+    args = parser.parse_args()
+
+    symbols, coords, energies = extract_trajectory(args.logfile)
+    output = args.output or os.path.splitext(args.logfile)[0] + "_traj.xyz"
+
+    if output.endswith(".npz"):
+        write_trajectory_npz(output, symbols, coords, energies)
+    elif output.endswith(".xyzb"):
+        write_xyzb(output, symbols, coords, energies, args.logfile)
+    else:
+        write_trajectory_xyz(output, symbols, coords, energies)
+    print(f"✅ {coords.shape[0]} steps of {coords.shape[1]} atoms written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,11 @@ import argparse
 import re
 import os
 
+from orca_log import open_log
+
 def extract_last_geometry(filename):
     atoms = []
-    with open(filename, 'r') as f:
+    with open_log(filename) as f:
         lines = f.readlines()
 
     for i, line in enumerate(lines):
@@ -1,31 +1,17 @@
 #!/usr/bin/env python3
 import argparse
-import re
 import os
 
+from binary_xyz import write_xyzb
+from orca_log import scan_log
+from xyz_io import write_xyz
+
 periodic_table = {
     1: 'H', 6: 'C', 7: 'N', 8: 'O', 9: 'F', 16: 'S', 17: 'Cl', 35: 'Br', 53: 'I'
 }
 
 def extract_last_geometry(filename):
-    atoms = []
-    with open(filename, 'r') as f:
-        lines = f.readlines()
-    
-    # for converged log files
-    for i, line in enumerate(lines):
-        if "Final structure (Angstroms):" in line:
-            # Geometry starts 3 lines after this one:
-            # Line 1 = "Fragment 1 (Ang)"
-            # Line 2 = (blank)
-            # Line 3+ = coordinates
-            for coord_line in lines[i + 3:]:
-                match = re.match(r'^\s*([A-Z][a-z]?)\s+(-?\d+\.\d+)\s+(-?\d+\.\d+)\s+(-?\d+\.\d+)', coord_line)
-                if match:
-                    symbol, x, y, z = match.groups()
-                    atoms.append((symbol, float(x), float(y), float(z)))
-                else:
-                    break
+    atoms = scan_log(filename, start="Final structure (Angstroms):")["Final Geometry"]
     if not atoms:
         raise RuntimeError("❌ Final structure not found in the file.")
     return atoms
@@ -36,21 +22,20 @@ def atomic_symbol(z):
     }
     return periodic_table.get(z, f"Z{z}")
 
-def write_xyz(atoms, outfile):
-    with open(outfile, 'w') as f:
-        f.write(f"{len(atoms)}\n")
-        f.write("Final geometry from Psi4 optimization\n")
-        for symbol, x, y, z in atoms:
-            f.write(f"{symbol:<2}  {x: >12.6f}  {y: >12.6f}  {z: >12.6f}\n")
-
 def main():
     parser = argparse.ArgumentParser(description="Extract final geometry from Psi4 output and save as .xyz")
     parser.add_argument("logfile", help="Psi4 output file")
+    parser.add_argument("-o", "--output", help="Output file; .xyzb writes the binary format (default: <log>.xyz)")
     args = parser.parse_args()
 
-    xyzfile = os.path.splitext(args.logfile)[0] + ".xyz"
+    xyzfile = args.output or os.path.splitext(args.logfile)[0] + ".xyz"
     atoms = extract_last_geometry(args.logfile)
-    write_xyz(atoms, xyzfile)
+    symbols = [atom[0] for atom in atoms]
+    coords = [atom[1:] for atom in atoms]
+    if xyzfile.endswith(".xyzb"):
+        write_xyzb(xyzfile, symbols, [coords], sources=args.logfile)
+    else:
+        write_xyz(xyzfile, symbols, coords, "Final geometry from Psi4 optimization")
     print(f"✅ Final structure written to {xyzfile}")
 
 if __name__ == "__main__":
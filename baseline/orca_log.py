@@ -0,0 +1,480 @@
+"""
+Single-pass scanner for ORCA output files.
+
+Every analysis script reads the same quantities out of the same log, so the
+parsing lives here once: the log is streamed line by line and every quantity
+of interest is collected into one result dict in a single read.
+"""
+import bz2
+import gzip
+import io
+import lzma
+import mmap
+import os
+import re
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Labels used by the timing tables, keyed by the line prefix ORCA prints
+timing_keys = {
+    "Sum of individual times": "Total",
+    "Startup calculation": "Startup",
+    "SCF iterations": "SCF",
+    "Property integrals": "Integrals",
+    "SCF Response": "SCF_Response",
+    "Property calculations": "Properties",
+    "SCF Gradient evaluation": "Gradient",
+    "Geometry relaxation": "Relax"
+}
+
+eh_re = re.compile(r'([-+]?\d+\.\d+)\s+Eh')
+float_re = re.compile(r'([-+]?\d+\.\d+)')
+time_re = re.compile(r"\.\.\.\s+([0-9.]+)\s+sec")
+coord_re = re.compile(r'^\s*([A-Z][a-z]?)\s+(-?\d+\.\d+)\s+(-?\d+\.\d+)\s+(-?\d+\.\d+)')
+ir_re = re.compile(r"\s*\d+:\s+([0-9.]+)\s+[0-9.Ee+-]+\s+([0-9.Ee+-]+)")
+scf_re = re.compile(r"^\s*(\d+)\s+(-?\d+\.\d+)\s+(-?\d+\.\d+(?:[eE][-+]?\d+)?)\s")
+cycle_re = re.compile(r"GEOMETRY OPTIMIZATION CYCLE\s+(\d+)")
+freq_re = re.compile(r"^\s*\d+:\s+(-?\d+\.\d+)\s+cm\*\*-1")
+thermo_re = {
+    "Temperature": re.compile(r"^\s*Temperature\s+\.\.\.\s+(-?\d+\.\d+)"),
+    "Pressure": re.compile(r"^\s*Pressure\s+\.\.\.\s+(-?\d+\.\d+)"),
+    "Total Mass": re.compile(r"^\s*Total Mass\s+\.\.\.\s+(-?\d+\.\d+)"),
+    "Symmetry Number": re.compile(r"Symmetry Number:\s+(\d+)"),
+    "Multiplicity": re.compile(r"^\s*Multiplicity\s+Mult\s+\.+\s+(\d+)"),
+}
+convergence_re = re.compile(
+    r"^\s*(Energy change|RMS gradient|MAX gradient|RMS step|MAX step)\s+(\S+)\s+(\S+)\s+(YES|NO)")
+
+# Section headers that tell which part of the job is currently running
+steps = {
+    "SCF ITERATIONS": "SCF",
+    "ORCA SCF GRADIENT CALCULATION": "Gradient",
+    "Geometry convergence": "Relax",
+    "ORCA SCF HESSIAN": "Hessian",
+    "ORCA NUMERICAL FREQUENCIES": "Hessian",
+    "VIBRATIONAL FREQUENCIES": "Frequencies",
+    "THERMOCHEMISTRY AT": "Thermochemistry",
+}
+
+
+# Leading bytes of the compressed formats finished logs are stored in
+magic_numbers = {
+    b"\x1f\x8b": "gzip",
+    b"\xfd7zXZ\x00": "xz",
+    b"(\xb5/\xfd": "zstd",
+    b"BZh": "bz2",
+}
+compressed_suffixes = (".gz", ".xz", ".zst", ".bz2")
+
+
+def compression(filename):
+    """Name of the compression format of `filename`, or None for plain text."""
+    with open(filename, "rb") as f:
+        head = f.read(6)
+    for magic, kind in magic_numbers.items():
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def open_log(filename, binary=False):
+    """
+    Open a log for reading, decompressing gzip, xz, bzip2 or zstd on the fly.
+
+    The format is detected from the leading bytes, not the file name. Data is
+    decompressed as it is read, so no uncompressed copy is ever written.
+    """
+    kind = compression(filename)
+    if kind is None:
+        raw = open(filename, "rb")
+    elif kind == "gzip":
+        raw = gzip.open(filename, "rb")
+    elif kind == "xz":
+        raw = lzma.open(filename, "rb")
+    elif kind == "bz2":
+        raw = bz2.open(filename, "rb")
+    else:
+        if zstandard is None:
+            raise RuntimeError(f"{filename} is zstd-compressed; install the 'zstandard' package to read it")
+        raw = zstandard.ZstdDecompressor().stream_reader(open(filename, "rb"), closefd=True)
+    return raw if binary else io.TextIOWrapper(raw, errors="replace")
+
+
+def new_result(filename=None):
+    return {
+        "File": Path(filename).name if filename else None,
+        "E(electronic)": None,
+        "ZPE": None,
+        "Thermal Energy": None,
+        "Enthalpy": None,
+        "Entropy Corr": None,
+        "G(final)": None,
+        # inputs of thermochemistry, see thermo.py
+        "Temperature": None,
+        "Pressure": None,
+        "Total Mass": None,
+        "Symmetry Number": None,
+        "Rotational Constants": None,
+        "Multiplicity": None,
+        "Energies": 0,           # number of FINAL SINGLE POINT ENERGY lines seen
+        "Geometry": [],          # last CARTESIAN COORDINATES (ANGSTROEM) block
+        "Geometry Steps": 0,
+        "Geometries": [],        # every block, only when keep_geometries=True
+        "Final Geometry": [],    # last "Final structure (Angstroms):" block
+        "Frequencies": [],       # VIBRATIONAL FREQUENCIES, all 3N modes
+        "IR Frequencies": [],
+        "IR Intensities": [],
+        "Timings": {},
+        # progress of the job, used when following running logs
+        "Status": "running",
+        "Step": None,
+        "Opt Cycle": 0,
+        "SCF Iterations": 0,
+        "SCF Energy": None,
+        "SCF Delta-E": None,
+        "Convergence": {},       # item -> (value, tolerance, converged)
+    }
+
+
+class LogScanner:
+    """
+    Line-driven state machine that fills a result dict from ORCA output.
+
+    Lines are fed one at a time, so the same scanner serves whole files and
+    logs that are still being written. Only the tables that are currently
+    being read are held in memory.
+    """
+
+    def __init__(self, filename=None, keep_geometries=False):
+        self.result = new_result(filename)
+        self.keep_geometries = keep_geometries
+        self._block = None
+        self._skip = 0
+        self._rows = []
+
+    def feed(self, line):
+        if self._block is not None:
+            self._read_block(line)
+            return
+        match = trigger_re.search(line)
+        if match:
+            handlers[match.group()](self, line)
+
+    def close(self):
+        """Flush a table that runs up to the end of the file."""
+        if self._block is not None:
+            self._end_block()
+        return self.result
+
+    # ---- single-line quantities ----
+
+    def _energy(self, line):
+        try:
+            self.result["E(electronic)"] = float(line.split()[-1])
+            self.result["Energies"] += 1
+        except ValueError:
+            pass
+
+    def _zpe(self, line):
+        match = eh_re.search(line)
+        if match:
+            self.result["ZPE"] = float(match.group(1))
+
+    def _thermal(self, line):
+        if "..." in line:
+            try:
+                self.result["Thermal Energy"] = float(line.split()[-2])
+            except (ValueError, IndexError):
+                pass
+
+    def _enthalpy(self, line):
+        match = eh_re.search(line)
+        if match:
+            self.result["Enthalpy"] = float(match.group(1))
+
+    def _entropy(self, line):
+        match = eh_re.search(line)
+        if match:
+            self.result["Entropy Corr"] = float(match.group(1))
+
+    def _gibbs(self, line):
+        match = float_re.search(line)
+        if match:
+            self.result["G(final)"] = float(match.group(1))
+
+    def _thermo_input(self, line):
+        for key, regex in thermo_re.items():
+            match = regex.search(line)
+            if match:
+                value = match.group(1)
+                self.result[key] = int(value) if key in ("Symmetry Number", "Multiplicity") else float(value)
+
+    def _rotational_constants(self, line):
+        self.result["Rotational Constants"] = [float(x) for x in float_re.findall(line.split(":", 1)[1])]
+
+    def _cycle(self, line):
+        match = cycle_re.search(line)
+        if match:
+            self.result["Opt Cycle"] = int(match.group(1))
+
+    def _status(self, line):
+        if "TERMINATED NORMALLY" in line:
+            self.result["Status"] = "finished"
+        elif "error termination" in line:
+            self.result["Status"] = "error"
+        elif "HAS CONVERGED" in line:
+            self.result["Status"] = "converged"
+
+    def _step(self, line):
+        for key, step in steps.items():
+            if key in line:
+                self.result["Step"] = step
+                break
+        if self.result["Step"] == "SCF":
+            self.result["SCF Iterations"] = 0
+            self._start_block("scf", 0)
+        elif self.result["Step"] == "Relax":
+            self.result["Convergence"] = {}
+            self._start_block("convergence", 0)
+        elif self.result["Step"] == "Frequencies" and "VIBRATIONAL FREQUENCIES" in line:
+            self._start_block("frequencies", 0)
+
+    def _timing(self, line):
+        stripped = line.strip()
+        for key, label in timing_keys.items():
+            if stripped.startswith(key):
+                match = time_re.search(line)
+                if match:
+                    self.result["Timings"][label] = float(match.group(1))
+                break
+
+    # ---- tables ----
+
+    def _start_block(self, kind, skip):
+        self._block = kind
+        self._skip = skip
+        self._rows = []
+
+    def _read_block(self, line):
+        if self._skip:
+            self._skip -= 1
+            return
+
+        if self._block == "scf":
+            match = scf_re.match(line)
+            if match:
+                self.result["SCF Iterations"] = int(match.group(1))
+                self.result["SCF Energy"] = float(match.group(2))
+                self.result["SCF Delta-E"] = float(match.group(3))
+            elif scf_end_re.search(line):
+                self._end_block()
+                self.feed(line)
+        elif self._block == "convergence":
+            match = convergence_re.match(line)
+            if match:
+                item, value, tolerance, converged = match.groups()
+                try:
+                    self.result["Convergence"][item] = (float(value), float(tolerance), converged == "YES")
+                except ValueError:
+                    pass
+            elif self.result["Convergence"] and not line.strip().startswith("-"):
+                self._end_block()
+        elif self._block == "frequencies":
+            match = freq_re.match(line)
+            if match:
+                self._rows.append(float(match.group(1)))
+            elif self._rows and not line.strip():
+                self._end_block()
+        elif self._block in ("geometry", "final"):
+            match = coord_re.match(line)
+            if match:
+                symbol, x, y, z = match.groups()
+                self._rows.append((symbol, float(x), float(y), float(z)))
+            else:
+                self._end_block()
+        elif self._block == "ir-header":
+            if line.strip().startswith("Mode"):
+                self._block = "ir-dashes"
+        elif self._block == "ir-dashes":
+            stripped = line.strip()
+            if stripped and set(stripped) == {"-"}:
+                self._block = "ir"
+        elif self._block == "ir":
+            if not line.strip():
+                self._end_block()
+                return
+            match = ir_re.match(line)
+            if match:
+                self._rows.append((float(match.group(1)), float(match.group(2))))
+
+    def _end_block(self):
+        kind, rows = self._block, self._rows
+        self._block = None
+        self._rows = []
+        if kind == "geometry":
+            self.result["Geometry"] = rows
+            self.result["Geometry Steps"] += 1
+            if self.keep_geometries:
+                self.result["Geometries"].append(rows)
+        elif kind == "final":
+            self.result["Final Geometry"] = rows
+        elif kind == "frequencies":
+            self.result["Frequencies"] = rows
+        elif kind == "ir":
+            self.result["IR Frequencies"] = [f for f, _ in rows]
+            self.result["IR Intensities"] = [i for _, i in rows]
+
+    def _geometry(self, line):
+        # Header is followed by a dashed rule, then the coordinates
+        self._start_block("geometry", 1)
+
+    def _final_structure(self, line):
+        # Psi4/optking: "Fragment 1 (Ang)" and a blank line precede the coordinates
+        self._start_block("final", 2)
+
+    def _ir(self, line):
+        self._start_block("ir-header", 0)
+
+
+handlers = {
+    "FINAL SINGLE POINT ENERGY": LogScanner._energy,
+    "Zero point energy": LogScanner._zpe,
+    "Total thermal energy": LogScanner._thermal,
+    "Total Enthalpy": LogScanner._enthalpy,
+    "Total entropy correction": LogScanner._entropy,
+    "Final Gibbs free energy": LogScanner._gibbs,
+    "CARTESIAN COORDINATES (ANGSTROEM)": LogScanner._geometry,
+    "Final structure (Angstroms):": LogScanner._final_structure,
+    "IR SPECTRUM": LogScanner._ir,
+    "Rotational constants in cm-1": LogScanner._rotational_constants,
+    "GEOMETRY OPTIMIZATION CYCLE": LogScanner._cycle,
+    "THE OPTIMIZATION HAS CONVERGED": LogScanner._status,
+    "ORCA TERMINATED NORMALLY": LogScanner._status,
+    "error termination": LogScanner._status,
+}
+for _key in steps:
+    handlers[_key] = LogScanner._step
+for _key in thermo_re:
+    handlers[_key] = LogScanner._thermo_input
+for _key in timing_keys:
+    handlers[_key] = LogScanner._timing
+
+# One alternation over every trigger keeps the per-line cost to a single search
+trigger_re = re.compile("|".join(re.escape(key) for key in handlers))
+
+# Timing lines matched directly in the raw bytes, see read_timings()
+timings_marker = "Timings for individual modules"
+timing_line_re = re.compile(
+    rb"^[ \t]*(" + b"|".join(re.escape(key.encode()) for key in timing_keys) + rb")"
+    rb"[^\n]*?\.\.\.[ \t]+([0-9.]+)[ \t]+sec",
+    re.MULTILINE)
+
+# Lines that close the SCF iteration table
+scf_end_re = re.compile(r"SCF CONVERGED|SCF NOT CONVERGED|TOTAL SCF ENERGY|FINAL SINGLE POINT ENERGY")
+
+
+def find_last(filename, marker):
+    """
+    Byte offset of the line holding the last occurrence of `marker`, or None.
+
+    The file is memory-mapped and searched from the end, so final energies
+    and geometries of long optimizations are found without reading the
+    earlier cycles at all. Compressed logs cannot be searched backwards and
+    always give None.
+    """
+    if compression(filename):
+        return None
+    needle = marker.encode()
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = mm.rfind(needle)
+            if pos < 0:
+                return None
+            return mm.rfind(b"\n", 0, pos) + 1
+
+
+def tail_lines(filename, marker):
+    """
+    Yield the lines of `filename` starting at the last line containing `marker`.
+    Nothing is yielded when the marker does not occur.
+    """
+    offset = find_last(filename, marker)
+    if offset is not None:
+        with open(filename, "rb") as raw:
+            raw.seek(offset)
+            yield from io.TextIOWrapper(raw, errors="replace")
+        return
+
+    # Compressed logs are streamed forwards, keeping only the lines after the
+    # latest occurrence seen so far
+    tail = None
+    with open_log(filename) as f:
+        for line in f:
+            if marker in line:
+                tail = [line]
+            elif tail is not None:
+                tail.append(line)
+    yield from tail or []
+
+
+def scan_log(filename, keep_geometries=False, start=None):
+    """
+    Stream an ORCA output file once and return every extracted quantity.
+
+    With `start`, scanning begins at the last line containing that marker
+    instead of the top of the file (or at the top when it is missing or the
+    log is compressed). Use it when only the final block of a log matters;
+    counters such as "Geometry Steps" then only cover the scanned tail.
+    """
+    scanner = LogScanner(filename, keep_geometries=keep_geometries)
+    offset = find_last(filename, start) if start else None
+    with open_log(filename, binary=True) as raw:
+        if offset:
+            raw.seek(offset)
+        for line in io.TextIOWrapper(raw, errors="replace"):
+            scanner.feed(line)
+    return scanner.close()
+
+
+def read_chunks(f, size=1 << 24):
+    """Read a binary stream in chunks that always end on a line boundary."""
+    rest = b""
+    while True:
+        block = f.read(size)
+        if not block:
+            if rest:
+                yield rest
+            return
+        block = rest + block
+        end = block.rfind(b"\n") + 1
+        if end == 0:
+            rest = block
+            continue
+        rest = block[end:]
+        yield block[:end]
+
+
+def read_timings(filename):
+    """
+    Module timings of an ORCA log as {label: seconds}.
+
+    Reading starts at the last TIMINGS section when it can be found from the
+    end of the file; otherwise the whole log is streamed in large chunks. In
+    both cases one compiled alternation over all timing keys runs on the raw
+    bytes, so no per-line Python code is involved.
+    """
+    timings = {}
+    offset = find_last(filename, timings_marker)
+    with open_log(filename, binary=True) as f:
+        if offset:
+            f.seek(offset)
+        for chunk in read_chunks(f):
+            for key, seconds in timing_line_re.findall(chunk):
+                timings[timing_keys[key.decode()]] = float(seconds)
+    return timings
@@ -7,27 +7,16 @@ import matplotlib.pyplot as plt
 import numpy as np
 import os
 
+from orca_log import read_timings, timing_keys
+
 # ---- ARGUMENT PARSING ----
 parser = argparse.ArgumentParser(description="Analyze ORCA timing from log files.")
 parser.add_argument("--prefix", required=True, help="Prefix for log files, e.g. pyr")
 args = parser.parse_args()
 
 prefix = args.prefix
-pattern = f"{prefix}*.log"
-file_re = re.compile(rf"^{re.escape(prefix)}(\d+).log$")
-
-# ---- SETTINGS ----
-timing_keys = {
-  "Sum of individual times": "Total",
-  "Startup calculation": "Startup",
-  "SCF iterations": "SCF",
-  "Property integrals": "Integrals",
-  "SCF Response": "SCF_Response",
-  "Property calculations": "Properties",
-  "SCF Gradient evaluation": "Gradient",
-  "Geometry relaxation": "Relax"
-}
-time_re = re.compile(r"\.\.\.\s+([0-9.]+)\s+sec")
+pattern = f"{prefix}*.log*"
+file_re = re.compile(rf"^{re.escape(prefix)}(\d+).log(\.(gz|xz|zst|bz2))?$")
 
 # ---- PARSE FILES ----
 rows = []
@@ -39,14 +28,7 @@ for file in sorted(glob.glob(pattern)):
   cores = int(match.group(1))
   times = {"nproc": cores}
 
-  with open(file) as f:
-    for line in f:
-      for key, label in timing_keys.items():
-        if line.strip().startswith(key):
-          match = time_re.search(line)
-          if match:
-            times[label] = float(match.group(1))
-          break
+  times.update(read_timings(file))
 
   rows.append(times)
 
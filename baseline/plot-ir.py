@@ -1,23 +1,29 @@
 #!/usr/bin/env python3
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.stats import norm
 import argparse
 import os
 
+from spectra import adaptive_grid, backends, grid_modes, shapes, to_uniform
+from spectrum_cache import SPECTRUM_CACHE_DIR, cached_broaden
+
+
 def read_spectrum(filename):
     data = np.loadtxt(filename)
     freqs = data[:, 0]
     intensities = data[:, 1]
     return freqs, intensities
 
-def broaden_spectrum(freqs, intensities, fwhm=20.0, resolution=0.5, xrange=(0, 4000)):
-    sigma = fwhm / (2 * np.sqrt(2 * np.log(2)))
-    x = np.arange(xrange[0], xrange[1], resolution)
-    y = np.zeros_like(x)
-    for freq, inten in zip(freqs, intensities):
-        y += inten * norm.pdf(x, freq, sigma)
-    return x, y
+def broaden_spectrum(freqs, intensities, fwhm=20.0, resolution=0.5, xrange=(0, 4000), shape="gaussian", backend="auto",
+                     cache_dir=SPECTRUM_CACHE_DIR, grid="uniform"):
+    # adaptive: points of the uniform grid about fwhm/20 apart near peaks, sparser away from them;
+    # interpolated: those, resampled onto the uniform grid
+    if grid == "uniform":
+        x = np.arange(xrange[0], xrange[1], resolution)
+        return x, cached_broaden(x, freqs, intensities, cache_dir, shape=shape, fwhm=fwhm, backend=backend)
+    x = adaptive_grid(freqs, fwhm, resolution, xrange[0], xrange[1] - resolution)
+    y = cached_broaden(x, freqs, intensities, cache_dir, shape=shape, fwhm=fwhm, backend=backend)
+    return to_uniform(x, y, resolution) if grid == "interpolated" else (x, y)
 
 def plot_spectrum(x, y, title, output_pdf):
     plt.figure(figsize=(6, 4))
@@ -35,11 +41,19 @@ def main():
     parser.add_argument("filename", help="Input file with frequency and intensity columns")
     parser.add_argument("--output", help="Output PDF file name")
     parser.add_argument("--title", help="Custom title for the plot")
-    parser.add_argument("--fwhm", type=float, default=20.0, help="FWHM for Gaussian broadening (cm⁻¹)")
+    parser.add_argument("--fwhm", type=float, default=20.0, help="FWHM of the line shape (cm⁻¹)")
+    parser.add_argument("--shape", choices=shapes, default="gaussian", help="Line shape (default: gaussian)")
+    parser.add_argument("--backend", choices=backends, default="auto", help="Broadening backend (default: auto)")
+    parser.add_argument("--grid", choices=grid_modes, default="uniform",
+                        help="uniform: every 0.5 cm⁻¹; adaptive: points about FWHM/20 apart near peaks and sparser in "
+                             "between (smaller files); interpolated: adaptive, then resampled to the uniform grid "
+                             "(default: uniform)")
+    parser.add_argument("--no-cache", action="store_true", help="Broaden again instead of using the spectrum cache")
     args = parser.parse_args()
 
     freqs, intensities = read_spectrum(args.filename)
-    x, y = broaden_spectrum(freqs, intensities, fwhm=args.fwhm)
+    x, y = broaden_spectrum(freqs, intensities, fwhm=args.fwhm, shape=args.shape, backend=args.backend,
+                           cache_dir=None if args.no_cache else SPECTRUM_CACHE_DIR, grid=args.grid)
 
     base_name = os.path.splitext(os.path.basename(args.filename))[0]
     plot_title = args.title if args.title else base_name
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Best-fit RMSD between conformers.
+
+RMSDs to a reference use the Kabsch superposition from one batched SVD of
+the 3x3 covariance matrices. The pairwise matrix uses Theobald's quaternion
+characteristic polynomial (QCP): the largest eigenvalue of the quaternion
+key matrix is found by Newton iterations that run on whole blocks of pairs
+at once, so no per-pair matrix decomposition is needed. The matrix is
+filled in square blocks, which bounds the memory, and the blocks can be
+spread over a process pool.
+
+Run this file directly to compare, cluster or deduplicate conformer sets.
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from binary_xyz import comment_energies
+from harvest import available_cores
+from xyz_io import read_xyz, write_xyz
+
+
+def heavy_atom_mask(symbols):
+    return np.asarray(symbols) != "H"
+
+
+def centered(frames, mask=None):
+    frames = np.asarray(frames, dtype=float)
+    if mask is not None:
+        frames = frames[..., mask, :]
+    return frames - frames.mean(axis=-2, keepdims=True)
+
+
+def kabsch(reference, frames, mask=None):
+    """
+    Rotation matrices (nframes, 3, 3) that best superimpose each centered
+    frame onto the centered reference, and the resulting RMSDs.
+    """
+    ref = centered(reference, mask)
+    mobile = centered(frames, mask)
+    H = np.einsum("fai,aj->fij", mobile, ref)
+    u, s, vt = np.linalg.svd(H)
+    d = np.sign(np.linalg.det(u @ vt))
+    s[:, 2] *= d
+    u[:, :, 2] *= d[:, None]
+    R = np.swapaxes(u @ vt, 1, 2)
+
+    e0 = (mobile ** 2).sum(axis=(1, 2)) + (ref ** 2).sum()
+    msd = np.maximum(e0 - 2 * s.sum(axis=1), 0.0) / ref.shape[0]
+    return R, np.sqrt(msd)
+
+
+def rmsd_to_reference(reference, frames, mask=None):
+    return kabsch(reference, frames, mask)[1]
+
+
+def superimpose(reference, frames, mask=None):
+    """`frames` rotated and translated onto `reference`, fitted on the masked atoms."""
+    frames = np.asarray(frames, dtype=float)
+    R, _ = kabsch(reference, frames, mask)
+    fit = slice(None) if mask is None else mask
+    mobile_center = frames[:, fit].mean(axis=1, keepdims=True)
+    ref_center = np.asarray(reference)[fit].mean(axis=0)
+    return np.einsum("fij,faj->fai", R, frames - mobile_center) + ref_center
+
+
+def qcp_rmsd(A, B):
+    """
+    RMSD of every pair of centered frames from A (a, N, 3) and B (b, N, 3),
+    as an (a, b) array, by the QCP method.
+    """
+    natoms = A.shape[1]
+    # all covariance matrices of the block with a single matrix product
+    S = (A.transpose(0, 2, 1).reshape(-1, natoms) @ B.transpose(1, 0, 2).reshape(natoms, -1))
+    S = S.reshape(len(A), 3, len(B), 3).transpose(0, 2, 1, 3)
+    Sxx, Sxy, Sxz = S[..., 0, 0], S[..., 0, 1], S[..., 0, 2]
+    Syx, Syy, Syz = S[..., 1, 0], S[..., 1, 1], S[..., 1, 2]
+    Szx, Szy, Szz = S[..., 2, 0], S[..., 2, 1], S[..., 2, 2]
+
+    Sxx2, Syy2, Szz2 = Sxx * Sxx, Syy * Syy, Szz * Szz
+    Sxy2, Syz2, Sxz2 = Sxy * Sxy, Syz * Syz, Sxz * Sxz
+    Syx2, Szy2, Szx2 = Syx * Syx, Szy * Szy, Szx * Szx
+
+    SyzSzymSyySzz2 = 2.0 * (Syz * Szy - Syy * Szz)
+    Sxx2Syy2Szz2Syz2Szy2 = Syy2 + Szz2 - Sxx2 + Syz2 + Szy2
+    C2 = -2.0 * (Sxx2 + Syy2 + Szz2 + Sxy2 + Syx2 + Sxz2 + Szx2 + Syz2 + Szy2)
+    C1 = 8.0 * (Sxx * Syz * Szy + Syy * Szx * Sxz + Szz * Sxy * Syx
+                - Sxx * Syy * Szz - Syz * Szx * Sxy - Szy * Syx * Sxz)
+
+    SxzpSzx, SyzpSzy, SxypSyx = Sxz + Szx, Syz + Szy, Sxy + Syx
+    SyzmSzy, SxzmSzx, SxymSyx = Syz - Szy, Sxz - Szx, Sxy - Syx
+    SxxpSyy, SxxmSyy = Sxx + Syy, Sxx - Syy
+    Sxy2Sxz2Syx2Szx2 = Sxy2 + Sxz2 - Syx2 - Szx2
+
+    C0 = (Sxy2Sxz2Syx2Szx2 * Sxy2Sxz2Syx2Szx2
+          + (Sxx2Syy2Szz2Syz2Szy2 + SyzSzymSyySzz2) * (Sxx2Syy2Szz2Syz2Szy2 - SyzSzymSyySzz2)
+          + (-SxzpSzx * SyzmSzy + SxymSyx * (SxxmSyy - Szz)) * (-SxzmSzx * SyzpSzy + SxymSyx * (SxxmSyy + Szz))
+          + (-SxzpSzx * SyzpSzy - SxypSyx * (SxxpSyy - Szz)) * (-SxzmSzx * SyzmSzy - SxypSyx * (SxxpSyy + Szz))
+          + (SxypSyx * SyzpSzy + SxzpSzx * (SxxmSyy + Szz)) * (-SxymSyx * SyzmSzy + SxzpSzx * (SxxpSyy + Szz))
+          + (SxypSyx * SyzmSzy + SxzmSzx * (SxxmSyy - Szz)) * (-SxymSyx * SyzpSzy + SxzmSzx * (SxxpSyy - Szz)))
+
+    # Newton iterations for the largest root, starting from its upper bound E0
+    E0 = 0.5 * ((A ** 2).sum(axis=(1, 2))[:, None] + (B ** 2).sum(axis=(1, 2))[None, :])
+    lam = E0.copy()
+    for _ in range(50):
+        x2 = lam * lam
+        b = (x2 + C2) * lam
+        a = b + C1
+        delta = (a * lam + C0) / (2.0 * x2 * lam + b + a)
+        delta = np.nan_to_num(delta)
+        lam -= delta
+        if np.all(np.abs(delta) <= 1e-11 * np.abs(lam)):
+            break
+    return np.sqrt(np.maximum(2.0 * (E0 - lam), 0.0) / natoms)
+
+
+_frames = None
+
+
+def _init_worker(frames):
+    global _frames
+    _frames = frames
+
+
+def _block_job(bounds):
+    i0, i1, j0, j1 = bounds
+    return bounds, qcp_rmsd(_frames[i0:i1], _frames[j0:j1])
+
+
+def _store_tile(matrix, bounds, values):
+    i0, i1, j0, j1 = bounds
+    if i0 == j0:
+        # a tile on the diagonal holds both (i, j) and (j, i); keep one so the matrix is exactly symmetric
+        values = np.triu(values) + np.triu(values, 1).T
+    matrix[i0:i1, j0:j1] = values
+    matrix[j0:j1, i0:i1] = values.T
+
+
+def pairwise_rmsd(frames, mask=None, block=512, jobs=None):
+    """
+    Symmetric (n, n) matrix of best-fit RMSDs. Only the upper triangle of
+    `block` x `block` tiles is computed; with jobs > 1 the tiles are shared
+    out over a process pool.
+    """
+    frames = centered(frames, mask)
+    n = len(frames)
+    tiles = [(i, min(i + block, n), j, min(j + block, n))
+             for i in range(0, n, block) for j in range(i, n, block)]
+
+    matrix = np.zeros((n, n))
+    jobs = min(jobs or available_cores(), len(tiles))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(frames,)) as pool:
+            for bounds, values in pool.map(_block_job, tiles):
+                _store_tile(matrix, bounds, values)
+    else:
+        _init_worker(frames)
+        for tile in tiles:
+            _store_tile(matrix, *_block_job(tile))
+    np.fill_diagonal(matrix, 0.0)
+    return matrix
+
+
+def greedy_clusters(frames, threshold, mask=None, order=None):
+    """
+    Greedy clustering: in `order` (for example by increasing energy), each
+    frame not yet claimed becomes a representative and claims every
+    unclaimed frame within `threshold` Angstrom of it. Memory stays linear
+    in the number of frames.
+
+    Returns (representatives, labels): indices of the representatives and,
+    for every frame, the position of its cluster in representatives.
+    """
+    frames = centered(frames, mask)
+    n = len(frames)
+    order = np.arange(n) if order is None else np.asarray(order)
+    labels = np.full(n, -1)
+    representatives = []
+    for i in order:
+        if labels[i] >= 0:
+            continue
+        free = np.flatnonzero(labels < 0)
+        close = free[qcp_rmsd(frames[i:i + 1], frames[free])[0] <= threshold]
+        labels[close] = len(representatives)
+        labels[i] = len(representatives)
+        representatives.append(i)
+    return np.array(representatives, dtype=int), labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Best-fit RMSD, pairwise RMSD matrices and greedy clustering of conformers.")
+    parser.add_argument("xyz_files", nargs="+", help="XYZ files; all frames of all files form one conformer set")
+    parser.add_argument("--ref", help="Reference XYZ file (first frame) for RMSDs to a reference (default: first conformer)")
+    parser.add_argument("--heavy", action="store_true", help="Only compare heavy atoms")
+    parser.add_argument("--matrix", metavar="OUT.npy", help="Save the pairwise RMSD matrix")
+    parser.add_argument("--cluster", type=float, metavar="RMSD",
+                        help="Greedy clustering with this RMSD threshold in Angstrom; the lowest-energy frame "
+                             "(from the comment lines) of each cluster is written to --output")
+    parser.add_argument("-o", "--output", help="Representatives file for --cluster (default: <first input>_unique.xyz)")
+    parser.add_argument("--block", type=int, default=512, help="Tile size of the pairwise matrix (default: 512)")
+    parser.add_argument("-j", "--jobs", type=int, help="Number of processes for --matrix (default: all available cores)")
+    args = parser.parse_args()
+
+    inputs = [read_xyz(f) for f in args.xyz_files]
+    if len({len(symbols) for symbols, _, _ in inputs}) > 1:
+        print("❌ All input files must contain the same molecule")
+        return
+    symbols = inputs[0][0]
+    frames = np.concatenate([coords for _, coords, _ in inputs])
+    comments = [c for _, _, cs in inputs for c in cs]
+    names = [f"{os.path.basename(f)}:{k + 1}" for f, (_, coords, _) in zip(args.xyz_files, inputs)
+             for k in range(len(coords))]
+    mask = heavy_atom_mask(symbols) if args.heavy else None
+
+    if args.matrix:
+        matrix = pairwise_rmsd(frames, mask, args.block, args.jobs)
+        np.save(args.matrix, matrix)
+        print(f"✅ {len(frames)}x{len(frames)} RMSD matrix written to {args.matrix}")
+
+    if args.cluster is not None:
+        energies = comment_energies(comments)
+        order = np.argsort(np.where(np.isnan(energies), np.inf, energies), kind="stable")
+        representatives, labels = greedy_clusters(frames, args.cluster, mask, order)
+        output = args.output or os.path.splitext(args.xyz_files[0])[0] + "_unique.xyz"
+        write_xyz(output, symbols, frames[representatives], [comments[i] for i in representatives])
+        sizes = np.bincount(labels)
+        print("\t".join(["Cluster", "Representative", "Members"]))
+        for k, i in enumerate(representatives):
+            print("\t".join([str(k + 1), names[i], str(sizes[k])]))
+        print(f"✅ {len(representatives)} of {len(frames)} conformers kept, written to {output}")
+
+    if not args.matrix and args.cluster is None:
+        reference = read_xyz(args.ref)[1][0] if args.ref else frames[0]
+        print("\t".join(["Conformer", "RMSD (Å)"]))
+        for name, value in zip(names, rmsd_to_reference(reference, frames, mask)):
+            print(f"{name}\t{value:.4f}")
+
+
+if __name__ == "__main__":
+    main()
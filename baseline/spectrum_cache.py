@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache of broadened spectra.
+
+A broadened spectrum is stored as one .npy file holding the (2, npoints)
+array of x and y. The file name is a hash of everything the curve depends
+on: the stick positions and intensities, the grid (so its range and
+resolution) and the line shape parameters. Changing only the title, the
+colours or the output format of a plot therefore reuses the stored curve.
+
+Every hit touches the file, so the modification times order the entries by
+last use; when the directory grows beyond its size limit the least recently
+used spectra are deleted first.
+
+Run this file directly to inspect, trim or clear the cache.
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from spectra import broaden
+
+SPECTRUM_CACHE_DIR = ".orca-tools-spectra"
+MAX_CACHE_BYTES = 256 << 20
+
+# Bump whenever broaden() starts returning different curves for the same input
+CACHE_VERSION = 2
+
+
+def spectrum_key(x, positions, intensities, **params):
+    digest = hashlib.sha256()
+    digest.update(json.dumps({"version": CACHE_VERSION, **params}, sort_keys=True).encode())
+    for values in (x, positions, intensities):
+        values = np.ascontiguousarray(values, dtype="<f8").ravel()
+        digest.update(len(values).to_bytes(8, "little"))
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def load_spectrum(key, cache_dir=SPECTRUM_CACHE_DIR):
+    """(x, y) stored under `key`, or None; a hit marks the entry as recently used."""
+    path = os.path.join(cache_dir, key + ".npy")
+    try:
+        data = np.load(path)
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    return data[0], data[1]
+
+
+def cache_entries(cache_dir=SPECTRUM_CACHE_DIR):
+    """(mtime, size, path) of every stored spectrum, least recently used first."""
+    entries = []
+    if os.path.isdir(cache_dir):
+        for entry in os.scandir(cache_dir):
+            if entry.name.endswith(".npy"):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+    return sorted(entries)
+
+
+def evict(cache_dir=SPECTRUM_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """Delete the least recently used spectra until the cache fits in max_bytes; returns how many."""
+    entries = cache_entries(cache_dir)
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def store_spectrum(key, x, y, cache_dir=SPECTRUM_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """
+    Store (x, y) under `key`. Returns False when the cache cannot be written
+    (read-only directory, full disk); the cache is only an optimization, so
+    callers carry on without it.
+    """
+    tmp = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # written under a temporary name first, so concurrent readers never see half a file
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)]))
+        os.replace(tmp, os.path.join(cache_dir, key + ".npy"))
+        tmp = None
+        evict(cache_dir, max_bytes)
+    except OSError:
+        if tmp is not None:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+        return False
+    return True
+
+
+def cached_broaden(x, positions, intensities, cache_dir=SPECTRUM_CACHE_DIR, max_bytes=MAX_CACHE_BYTES, **params):
+    """
+    spectra.broaden() with a lookup in the spectrum cache first. Without a
+    cache directory this is a plain broaden() call.
+    """
+    if cache_dir is None:
+        return broaden(x, positions, intensities, **params)
+
+    key = spectrum_key(x, positions, intensities, **params)
+    hit = load_spectrum(key, cache_dir)
+    if hit is not None:
+        return hit[1]
+    y = broaden(x, positions, intensities, **params)
+    store_spectrum(key, x, y, cache_dir, max_bytes)
+    return y
+
+
+def parse_size(text):
+    """ "500M", "2G", "64k" or a plain number of bytes."""
+    units = {"k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+    text = text.strip().lower().rstrip("ib").rstrip("b")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect, trim or clear the broadened spectrum cache.")
+    parser.add_argument("--cache", default=SPECTRUM_CACHE_DIR, help=f"Cache directory (default: {SPECTRUM_CACHE_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Summarize the cache")
+    trim_parser = sub.add_parser("trim", help="Delete least recently used spectra down to a size")
+    trim_parser.add_argument("--max-size", default="256M", help="Size to trim to, e.g. 500M or 2G (default: 256M)")
+    sub.add_parser("clear", help="Delete every stored spectrum")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.cache):
+        print(f"❌ No spectrum cache found at {args.cache}")
+        return
+
+    if args.command == "stats":
+        entries = cache_entries(args.cache)
+        total = sum(size for _, size, _ in entries)
+        print(f"Cache directory: {args.cache}")
+        print(f"Spectra:         {len(entries)} ({total / (1 << 20):.1f} MiB)")
+    elif args.command == "trim":
+        print(f"🧹 Removed {evict(args.cache, parse_size(args.max_size))} spectra")
+    elif args.command == "clear":
+        print(f"🧹 Removed {evict(args.cache, 0)} spectra")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,29 @@
 #!/usr/bin/env python3
 import re
 import glob
+import argparse
 import pandas as pd
 
-# Define timing keys and readable labels
-timing_keys = {
-    "Sum of individual times": "Total",
-    "Startup calculation": "Startup",
-    "SCF iterations": "SCF",
-    "Property integrals": "Integrals",
-    "SCF Response": "SCF_Response",
-    "Property calculations": "Properties",
-    "SCF Gradient evaluation": "Gradient",
-    "Geometry relaxation": "Relax"
-}
+from log_cache import cached_parse, open_cache
+from orca_log import read_timings, timing_keys
 
-# Regex to extract time
-time_re = re.compile(r"\.\.\.\s+([0-9.]+)\s+sec")
+parser = argparse.ArgumentParser(description="Tabulate ORCA module timings of pyr-*cores.log files.")
+parser.add_argument("--no-cache", action="store_true", help="Parse every log again instead of using the results cache")
+args = parser.parse_args()
+
+cache = None if args.no_cache else open_cache()
 
 # Parse files
 rows = []
 
-for file in sorted(glob.glob("pyr-*cores.log")):
-    core_match = re.search(r"pyr-(\d+)cores\.log", file)
+for file in sorted(glob.glob("pyr-*cores.log*")):
+    core_match = re.search(r"pyr-(\d+)cores\.log(\.(gz|xz|zst|bz2))?$", file)
     if not core_match:
         continue
     cores = int(core_match.group(1))
     times = {"Cores": cores}
 
-    with open(file) as f:
-        for line in f:
-            for key, label in timing_keys.items():
-                if line.strip().startswith(key):
-                    match = time_re.search(line)
-                    if match:
-                        times[label] = float(match.group(1))
-                    break
+    times.update(cached_parse(file, cache, "timings", read_timings))
 
     rows.append(times)
 
@@ -0,0 +1,198 @@
+"""
+Vectorized ideal-gas / rigid-rotor / harmonic-oscillator thermochemistry.
+
+The frequencies, rotational constants, symmetry number, mass, multiplicity
+and electronic energy ORCA prints are enough to recompute ZPE, U, H, S and G
+at any temperature and pressure. All molecules and all conditions are
+evaluated together as one NumPy broadcast over a
+(molecules, temperatures, pressures) grid, so changing conditions is a
+post-processing step instead of a new frequency job.
+"""
+import numpy as np
+
+# CODATA 2018
+H_PLANCK = 6.62607015e-34      # J s
+K_BOLTZMANN = 1.380649e-23     # J/K
+C_CM_S = 2.99792458e10         # cm/s
+AVOGADRO = 6.02214076e23
+AMU_KG = 1.66053906660e-27
+HARTREE_J = 4.3597447222071e-18
+ATM_PA = 101325.0
+
+HARTREE_TO_KCAL = 627.509
+K_HARTREE = K_BOLTZMANN / HARTREE_J  # Boltzmann constant in Eh/K
+
+# Grimme's quasi-RRHO free-rotor interpolation (Chem. Eur. J. 2012, 18, 9955)
+QRRHO_CUTOFF = 100.0   # cm⁻¹
+QRRHO_ALPHA = 4
+QRRHO_BAV = 1e-44      # kg m²
+
+
+def pad(rows, fill=np.nan):
+    """Stack ragged per-molecule lists into one 2D array padded with `fill`."""
+    width = max((len(r) for r in rows), default=0)
+    out = np.full((len(rows), width), fill, dtype=float)
+    for i, r in enumerate(rows):
+        out[i, :len(r)] = r
+    return out
+
+
+def molecule_inputs(log):
+    """Pick the thermochemistry inputs out of a scan_log() result."""
+    return {
+        "energy": log["E(electronic)"],
+        "frequencies": log["Frequencies"],
+        "rotational_constants": log["Rotational Constants"] or [],
+        "symmetry_number": log["Symmetry Number"] or 1,
+        "mass": log["Total Mass"],
+        "multiplicity": log["Multiplicity"] or 1,
+    }
+
+
+def thermo_grid(molecules, temperatures, pressures=(1.0,), qrrho=False, cutoff=QRRHO_CUTOFF,
+                scale=1.0, concentration=None):
+    """
+    Thermochemistry of many molecules over a temperature/pressure grid.
+
+    `molecules` is a list of dicts as returned by molecule_inputs(),
+    temperatures are in K and pressures in atm. With `concentration`
+    (mol/L) the translational entropy uses that standard state instead of
+    the ideal gas at each pressure. Frequencies are multiplied by `scale`;
+    imaginary and zero modes are skipped, as ORCA does.
+
+    Returns a dict of (nmol, ntemp, npres) arrays: "ZPE", "U", "H" and "G"
+    in Eh, "S" in Eh/K, and "TS" in Eh.
+    """
+    T = np.asarray(temperatures, dtype=float)[None, :, None]
+    P = np.asarray(pressures, dtype=float)[None, None, :] * ATM_PA
+
+    energy = np.array([m["energy"] for m in molecules], dtype=float)[:, None, None]
+    mass = np.array([m["mass"] for m in molecules], dtype=float)[:, None, None] * AMU_KG
+    sigma = np.array([m["symmetry_number"] for m in molecules], dtype=float)[:, None, None]
+    mult = np.array([m["multiplicity"] for m in molecules], dtype=float)[:, None, None]
+
+    # ---- vibrations: (nmol, ntemp, nmodes) ----
+    nu = pad([m["frequencies"] for m in molecules], fill=0.0) * scale
+    real = nu > 0
+    nu = np.where(real, nu, 1.0)[:, None, :]
+    theta_v = H_PLANCK * C_CM_S * nu / K_BOLTZMANN
+    x = theta_v / T
+    mode = real[:, None, :]
+
+    zpe = 0.5 * K_HARTREE * np.where(real, theta_v[:, 0, :], 0.0).sum(axis=-1)
+    e_vib = K_HARTREE * np.where(mode, theta_v / np.expm1(x), 0.0).sum(axis=-1)
+    s_harmonic = x / np.expm1(x) - np.log1p(-np.exp(-x))
+    if qrrho:
+        mu = H_PLANCK / (8 * np.pi ** 2 * nu * C_CM_S)
+        mu_eff = mu * QRRHO_BAV / (mu + QRRHO_BAV)
+        s_rotor = 0.5 + np.log(np.sqrt(8 * np.pi ** 3 * mu_eff * K_BOLTZMANN * T / H_PLANCK ** 2))
+        weight = 1.0 / (1.0 + (cutoff / nu) ** QRRHO_ALPHA)
+        s_harmonic = weight * s_harmonic + (1.0 - weight) * s_rotor
+    s_vib = K_HARTREE * np.where(mode, s_harmonic, 0.0).sum(axis=-1)
+    zpe = zpe[:, None, None]
+    e_vib = e_vib[..., None]
+    s_vib = s_vib[..., None]
+
+    # ---- rotations: atoms, linear and nonlinear molecules ----
+    B = pad([m["rotational_constants"] for m in molecules], fill=0.0)
+    nonzero = B > 1e-8
+    nrot = nonzero.sum(axis=1)
+    theta_r = H_PLANCK * C_CM_S * np.where(nonzero, B, 1.0) / K_BOLTZMANN
+    log_theta = np.where(nonzero, np.log(theta_r), 0.0).sum(axis=1)[:, None, None]
+    linear = (nrot == 2)[:, None, None]
+    atom = (nrot == 0)[:, None, None]
+    # a linear molecule has two equal constants but only one enters q_rot
+    log_theta = np.where(linear, 0.5 * log_theta, log_theta)
+
+    s_rot = np.where(
+        linear,
+        np.log(T / sigma) - log_theta + 1.0,
+        np.log(np.sqrt(np.pi) / sigma) + 1.5 * np.log(T) - 0.5 * log_theta + 1.5)
+    s_rot = K_HARTREE * np.where(atom, 0.0, s_rot)
+    e_rot = K_HARTREE * T * np.where(atom, 0.0, np.where(linear, 1.0, 1.5))
+
+    # ---- translation and electronic ----
+    if concentration is not None:
+        volume = 1.0 / (concentration * 1000.0 * AVOGADRO)
+    else:
+        volume = K_BOLTZMANN * T / P
+    lam3 = (2 * np.pi * mass * K_BOLTZMANN * T / H_PLANCK ** 2) ** 1.5
+    s_trans = K_HARTREE * (np.log(lam3 * volume) + 2.5)
+    e_trans = 1.5 * K_HARTREE * T
+    s_el = K_HARTREE * np.log(mult)
+
+    shape = np.broadcast_shapes(energy.shape, T.shape, P.shape)
+    U = np.broadcast_to(energy + zpe + e_vib + e_rot + e_trans, shape)
+    H = U + K_HARTREE * T
+    S = np.broadcast_to(s_trans + s_rot + s_vib + s_el, shape)
+    return {
+        "ZPE": np.broadcast_to(zpe, shape),
+        "U": U,
+        "H": H,
+        "S": S,
+        "TS": T * S,
+        "G": H - T * S,
+    }
+
+
+def parse_grid(text):
+    """Parse "298.15", "250,298.15,350" or "start:stop:step" (stop included)."""
+    if ":" in text:
+        start, stop, step = (float(v) for v in text.split(":"))
+        return np.arange(start, stop + 0.5 * step, step)
+    return np.array([float(v) for v in text.split(",")])
+
+
+def boltzmann_ensemble(energies, groups=None, temperature=298.15):
+    """
+    Boltzmann populations of conformers, for many molecules at once.
+
+    `energies` are free energies in Eh and `groups` one label per conformer
+    (all conformers form one ensemble without it). Populations are computed
+    with a log-sum-exp shifted by the lowest energy of each group, so they
+    stay finite for any spread of energies.
+
+    Returns a dict with per-conformer arrays, in input order: "Group" (index
+    into "Labels"), "Relative Energy" (Eh above the group minimum),
+    "Population" and "Cumulative Population" (summed in order of increasing
+    energy within the group), and per-group arrays: "Labels", "Count",
+    "Minimum", "Average" (population-weighted mean energy) and "Ensemble"
+    (-kT ln of the ensemble partition function).
+    """
+    energies = np.asarray(energies, dtype=float)
+    if groups is None:
+        groups = np.zeros(len(energies), dtype=int)
+    labels, index = np.unique(np.asarray(groups), return_inverse=True)
+    kT = K_HARTREE * temperature
+
+    # conformers of a group are contiguous and sorted by energy
+    order = np.lexsort((energies, index))
+    e, g = energies[order], index[order]
+    starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+
+    minimum = e[starts]
+    relative = e - minimum[g]
+    w = np.exp(-relative / kT)
+    z = np.add.reduceat(w, starts)
+    population = w / z[g]
+    cumulative = np.cumsum(population)
+    cumulative -= np.r_[0.0, cumulative[starts[1:] - 1]][g]
+
+    unsorted = np.empty_like(order)
+    unsorted[order] = np.arange(len(order))
+    return {
+        "Group": index,
+        "Relative Energy": relative[unsorted],
+        "Population": population[unsorted],
+        "Cumulative Population": cumulative[unsorted],
+        "Labels": labels,
+        "Count": np.diff(np.r_[starts, len(e)]),
+        "Minimum": minimum,
+        "Average": np.add.reduceat(population * e, starts),
+        "Ensemble": minimum - kT * np.log(z),
+    }
+
+
+def boltzmann_weights(energies, temperature=298.15):
+    """Populations of one conformer ensemble; energies in Eh."""
+    return boltzmann_ensemble(energies, temperature=temperature)["Population"]
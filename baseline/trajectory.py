@@ -0,0 +1,105 @@
+"""
+Bulk extraction of every geometry step of an optimization log.
+
+All coordinate blocks are located with one regex over the raw log and the
+numbers of all blocks are converted to floats in a single NumPy call, giving a
+(nsteps, natoms, 3) array without a Python loop per atom or per step.
+"""
+import mmap
+import os
+import re
+
+import numpy as np
+
+from orca_log import compression, open_log
+from xyz_io import write_xyz
+
+BOHR_TO_ANGSTROM = 0.529177
+
+elements = (
+    "X H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu Zn "
+    "Ga Ge As Se Br Kr Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe"
+).split()
+
+_float = rb"-?\d+\.\d+"
+
+# ORCA: symbol and Angstrom coordinates under a dashed rule
+orca_block_re = re.compile(
+    rb"CARTESIAN COORDINATES \(ANGSTROEM\)\r?\n-+\r?\n"
+    rb"((?:[ \t]*[A-Z][a-z]?(?:[ \t]+" + _float + rb"){3}[ \t]*\r?\n)+)")
+
+# Psi4/optking: atomic number, mass and Bohr coordinates
+psi4_block_re = re.compile(
+    rb"Z \(Atomic Numbers\)[^\n]*\n"
+    rb"((?:[ \t]*\d+\.\d+(?:[ \t]+" + _float + rb"){4}[ \t]*\r?\n)+)")
+
+energy_re = re.compile(rb"FINAL SINGLE POINT ENERGY\s+(" + _float + rb")")
+
+
+def read_log_bytes(filename):
+    """The whole log as a bytes-like object; plain logs are memory-mapped."""
+    if compression(filename) is None:
+        with open(filename, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with open_log(filename, binary=True) as f:
+        return f.read()
+
+
+def symbol(z):
+    return elements[z] if 0 < z < len(elements) else f"Z{z}"
+
+
+def extract_trajectory(filename):
+    """
+    Every coordinate block of `filename` as (symbols, coords, energies).
+
+    symbols is an (natoms,) array, coords an (nsteps, natoms, 3) array in
+    Angstrom and energies the FINAL SINGLE POINT ENERGY of each step, or None
+    when the number of energies does not match the number of steps.
+    """
+    data = read_log_bytes(filename)
+    try:
+        blocks = [m.group(1) for m in orca_block_re.finditer(data)]
+        ncols = 4
+        if not blocks:
+            blocks = [m.group(1) for m in psi4_block_re.finditer(data)]
+            ncols = 5
+        energies = [float(e) for e in energy_re.findall(data)]
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+    if not blocks:
+        raise RuntimeError(f"❌ No coordinate blocks found in {filename}")
+
+    natoms = blocks[0].count(b"\n")
+    if any(block.count(b"\n") != natoms for block in blocks):
+        raise RuntimeError(f"❌ Atom count changes between steps in {filename}")
+
+    table = np.array(b"".join(blocks).split()).reshape(len(blocks), natoms, ncols)
+    if ncols == 4:
+        symbols = table[0, :, 0].astype(str)
+        coords = table[:, :, 1:].astype(float)
+    else:
+        symbols = np.array([symbol(int(float(z))) for z in table[0, :, 0]])
+        coords = table[:, :, 2:].astype(float) * BOHR_TO_ANGSTROM
+
+    if len(energies) != len(blocks):
+        energies = None
+    return symbols, coords, energies
+
+
+def write_trajectory_xyz(filename, symbols, coords, energies=None):
+    comments = [f"Step {step + 1}" for step in range(len(coords))]
+    if energies is not None:
+        comments = [f"{c}  E = {e:.10f}" for c, e in zip(comments, energies)]
+    write_xyz(filename, symbols, coords, comments)
+
+
+def write_trajectory_npz(filename, symbols, coords, energies=None):
+    arrays = {"symbols": symbols, "coords": coords}
+    if energies is not None:
+        arrays["energies"] = np.asarray(energies)
+    np.savez(filename, **arrays)
@@ -0,0 +1,436 @@
+"""
+Bulk reader and writer for XYZ files, including multi-frame trajectories.
+
+A file is returned as a symbols array of shape (natoms,) and a coordinate
+array of shape (nframes, natoms, 3). Most XYZ files are written with one
+fixed format, so every atom line has the same length and the decimal points
+line up; those files are converted straight from a byte matrix with integer
+arithmetic. Anything else goes through one np.loadtxt call over all atom
+lines. Neither path has a Python loop over atoms.
+"""
+import fnmatch
+import io
+import mmap
+import os
+import tarfile
+import time
+import warnings
+import zipfile
+
+import numpy as np
+
+from orca_log import compression, open_log
+
+DIGITS = np.frombuffer(b"0123456789", dtype=np.uint8)
+BLANKS = np.frombuffer(b" \t\r", dtype=np.uint8)
+
+
+def read_xyz_bytes(filename):
+    with open_log(filename, binary=True) as f:
+        return f.read()
+
+
+def line_bounds(data):
+    """Start and end offsets of every line of `data`."""
+    ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n"))
+    starts = np.r_[0, ends[:-1] + 1]
+    # trailing blank lines
+    while len(ends) and ends[-1] == starts[-1]:
+        starts, ends = starts[:-1], ends[:-1]
+    return starts, ends
+
+
+def fixed_layout(sample, ncols=3):
+    """
+    Columns of the numbers in a sample of equally long atom lines, as a
+    list of (first column, decimal point column, end column), or None.
+    """
+    dots = np.flatnonzero((sample == ord(".")).all(axis=0))
+    if len(dots) < ncols:
+        return None
+    all_blank = np.isin(sample, BLANKS).all(axis=0)
+    letters = ((sample | 0x20) >= ord("a")) & ((sample | 0x20) <= ord("z"))
+    symbol_cols = np.flatnonzero(letters[:, :dots[0]].any(axis=0))
+    begin = symbol_cols[-1] + 1 if len(symbol_cols) else 0
+
+    layout = []
+    for dot in dots[:ncols]:
+        end = dot + 1
+        while end < sample.shape[1] and not all_blank[end]:
+            end += 1
+        # at most 15 digits, so the integer mantissa is exact in a float64
+        if begin >= dot or end - begin > 16:
+            return None
+        layout.append((begin, dot, end))
+        begin = end
+    return layout
+
+
+def parse_fixed_width(lines, chunk=1 << 16):
+    """
+    Coordinates of equally long atom lines, given as a (nlines, width) byte
+    matrix, or None when the numbers do not share one column layout.
+
+    The digits of each number are a column slice of the matrix and are
+    turned into an integer mantissa with one matrix product per chunk.
+    """
+    layout = fixed_layout(lines[:4096])
+    if layout is None:
+        return None
+
+    values = np.empty((len(lines), len(layout)))
+    for k, (begin, dot, end) in enumerate(layout):
+        cols = np.arange(begin, end)
+        weights = np.where(cols < dot, 10.0 ** (end - cols - 2), 10.0 ** (end - cols - 1))
+        weights[cols == dot] = 0.0
+        scale = 10.0 ** (end - dot - 1)
+
+        for first in range(0, len(lines), chunk):
+            chars = lines[first:first + chunk, begin:end]
+            digits = chars - DIGITS[0]
+            is_digit = digits < 10
+            minus = chars == ord("-")
+            other = ~(is_digit | minus | (chars == ord(" ")) | (chars == ord("\t")))
+            other[:, dot - begin] = chars[:, dot - begin] != ord(".")
+            if other.any():
+                return None
+            digits[~is_digit] = 0
+            sign = np.where(minus.any(axis=1), -1.0, 1.0)
+            values[first:first + chunk, k] = sign * (digits.astype(float) @ weights) / scale
+    return values
+
+
+def read_xyz(filename):
+    """
+    All frames of an XYZ file as (symbols, coords, comments).
+
+    symbols is an (natoms,) array taken from the first frame, coords an
+    (nframes, natoms, 3) array and comments the list of comment lines.
+    Every frame must have the same number of atoms.
+    """
+    return parse_xyz(read_xyz_bytes(filename), filename)
+
+
+def parse_xyz(data, filename="<xyz>"):
+    """read_xyz() for XYZ text already in memory; `filename` is for messages."""
+    if data and not data.endswith(b"\n"):
+        data += b"\n"
+    starts, ends = line_bounds(data)
+    if not len(starts):
+        raise RuntimeError(f"❌ {filename} is empty")
+
+    natoms = int(data[starts[0]:ends[0]])
+    frame_lines = natoms + 2
+    nframes = len(starts) // frame_lines
+    if natoms == 0 or nframes == 0 or len(starts) % frame_lines:
+        return read_xyz_frames(filename, data)
+
+    starts = starts.reshape(nframes, frame_lines)
+    ends = ends.reshape(nframes, frame_lines)
+    if any(int(data[s:e]) != natoms for s, e in zip(starts[:, 0].tolist(), ends[:, 0].tolist())):
+        return read_xyz_frames(filename, data)
+    comments = [data[s:e].decode(errors="replace").strip() for s, e in zip(starts[:, 1].tolist(), ends[:, 1].tolist())]
+
+    # the atom lines of all frames, without the two header lines of each
+    atom_lines = b"".join(data[s:e] for s, e in zip(starts[:, 2].tolist(), (ends[:, -1] + 1).tolist()))
+    first = atom_lines.split(b"\n", natoms)[:natoms]
+    symbols = np.array([line.split()[0].decode() for line in first])
+
+    coords = None
+    widths = ends[:, 2:] - starts[:, 2:]
+    if (widths == widths[0, 0]).all():
+        lines = np.frombuffer(atom_lines, dtype=np.uint8).reshape(-1, widths[0, 0] + 1)[:, :-1]
+        coords = parse_fixed_width(lines)
+        # the layout was guessed from the bytes, so check it against the first frame
+        if coords is not None and not np.array_equal(coords[:natoms], [[float(x) for x in line.split()[1:4]] for line in first]):
+            coords = None
+    if coords is None:
+        coords = np.loadtxt(io.BytesIO(atom_lines), usecols=(1, 2, 3), ndmin=2, comments=None)
+    return symbols, coords.reshape(nframes, natoms, 3), comments
+
+
+def read_xyz_frames(filename, data=None):
+    """Frame-by-frame fallback for files whose header lines do not repeat evenly."""
+    if data is None:
+        data = read_xyz_bytes(filename)
+    lines = data.split(b"\n")
+    atom_lines, comments = [], []
+    natoms = None
+    i = 0
+    while i < len(lines) and lines[i].strip():
+        n = int(lines[i])
+        if natoms is not None and n != natoms:
+            raise RuntimeError(f"❌ Atom count changes between frames in {filename}")
+        if i + 2 + n > len(lines):
+            raise RuntimeError(f"❌ Incomplete frame at line {i + 1} of {filename}")
+        natoms = n
+        comments.append(lines[i + 1].decode(errors="replace").strip())
+        atom_lines.extend(lines[i + 2:i + 2 + n])
+        i += 2 + n
+
+    if natoms is None:
+        raise RuntimeError(f"❌ No frames found in {filename}")
+    symbols = np.array([line.split()[0].decode() for line in atom_lines[:natoms]])
+    coords = np.loadtxt(io.BytesIO(b"\n".join(atom_lines)), usecols=(1, 2, 3), ndmin=2, comments=None)
+    return symbols, coords.reshape(len(comments), natoms, 3), comments
+
+
+def format_xyz(symbols, coords, comments=None):
+    """
+    XYZ text for one frame, coords (natoms, 3), or many, coords
+    (nframes, natoms, 3). `comments` is one string or one per frame.
+    """
+    coords = np.asarray(coords, dtype=float)
+    if coords.ndim == 2:
+        coords = coords[None]
+    nframes, natoms, _ = coords.shape
+    if comments is None or isinstance(comments, str):
+        comments = [comments or ""] * nframes
+
+    # the symbols are baked into the template, so each frame is one % call
+    template = "".join(f"{s:<2}  %12.6f  %12.6f  %12.6f\n" for s in symbols)
+    header = f"{natoms}\n"
+    return "".join(
+        header + comment + "\n" + template % tuple(frame)
+        for comment, frame in zip(comments, coords.reshape(nframes, -1).tolist()))
+
+
+def write_xyz(filename, symbols, coords, comments=None):
+    with open(filename, "w") as f:
+        f.write(format_xyz(symbols, coords, comments))
+
+
+def scan_frame_offsets(mm, chunk=1 << 26):
+    """
+    Byte offset of every complete frame of a memory-mapped XYZ file, plus
+    the offset where the last one ends, in one pass over `chunk`-sized
+    windows. Only the atom-count lines are parsed; all other lines are
+    skipped by counting newlines.
+    """
+    size = len(mm)
+    offsets = []
+    skip = 0        # lines to skip before the next atom-count line
+    carry = 0       # start of the line that runs into the next window
+    end = 0
+    for pos in range(0, size, chunk):
+        window = np.frombuffer(mm, dtype=np.uint8, count=min(chunk, size - pos), offset=pos)
+        line_starts = [carry] + (pos + 1 + np.flatnonzero(window == ord("\n"))).tolist()
+        if pos + chunk >= size and mm[size - 1:size] != b"\n":
+            line_starts.append(size)
+        i = skip
+        if i < len(line_starts):
+            end = line_starts[i]
+        while i + 1 < len(line_starts):
+            header = mm[line_starts[i]:line_starts[i + 1]].strip()
+            if not header:
+                break
+            try:
+                frame_lines = int(header) + 2
+            except ValueError:
+                warnings.warn(f"Could not read atom count at byte {line_starts[i]}")
+                break
+            offsets.append(line_starts[i])
+            i += frame_lines
+            if i < len(line_starts):
+                end = line_starts[i]
+        else:
+            skip = i - (len(line_starts) - 1)
+            carry = line_starts[-1]
+            continue
+        break
+
+    complete = [offset for offset in offsets if offset < end]
+    if len(complete) < len(offsets):
+        warnings.warn(f"Incomplete frame at byte {offsets[-1]}")
+    return complete, end
+
+
+# first item of an .idx.npy file; the next three are the size, mtime_ns and inode of the trajectory
+INDEX_MAGIC = 0x58595a49445831  # "XYZIDX1"
+INDEX_HEADER = 4
+
+
+def frame_index(filename, rebuild=False):
+    """
+    Frame offsets of an XYZ trajectory: an int64 array whose item k is the
+    byte offset of frame k, with one extra item for the end of the last frame.
+
+    The index is saved next to the file as <file>.idx.npy and memory-mapped
+    on later calls, so reading any frame of a multi-GB trajectory only
+    touches the bytes of that frame. It records the size, modification time
+    and inode of the trajectory and is built again when any of them differ.
+    """
+    if compression(filename) is not None:
+        raise RuntimeError(f"❌ {filename} is compressed; decompress it for indexed access")
+    index_file = filename + ".idx.npy"
+    st = os.stat(filename)
+    identity = [INDEX_MAGIC, st.st_size, st.st_mtime_ns, st.st_ino]
+    if not rebuild and os.path.exists(index_file):
+        try:
+            index = np.load(index_file, mmap_mode="r")
+        except (OSError, ValueError):
+            index = None
+        if (index is not None and index.ndim == 1 and len(index) > INDEX_HEADER
+                and index[:INDEX_HEADER].tolist() == identity and index[-1] <= st.st_size):
+            return index[INDEX_HEADER:]
+
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            offsets = np.zeros(1, dtype=np.int64)
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                starts, end = scan_frame_offsets(mm)
+            offsets = np.array(starts + [end], dtype=np.int64)
+    np.save(index_file, np.r_[np.array(identity, dtype=np.int64), offsets])
+    return offsets
+
+
+def select_frames(spec, nframes):
+    """
+    Frame numbers selected by `spec`, 0-based. `spec` uses 1-based frame
+    numbers like the files separate-xyz.py writes: "7", "1000-1200",
+    "1000-" or "1,5,9-12", optionally with a ":step" stride as in "1-:50".
+    """
+    spec, _, step = spec.partition(":")
+    selected = []
+    for part in (spec or "1-").split(","):
+        first, dash, last = part.partition("-")
+        first = int(first) if first else 1
+        last = (int(last) if last else nframes) if dash else first
+        selected.append(np.arange(max(first, 1) - 1, min(last, nframes)))
+    frames = np.concatenate(selected) if selected else np.arange(0)
+    return frames[::int(step)] if step else frames
+
+
+def iter_frame_bytes(filename, frames, offsets=None):
+    """Raw XYZ text of each of `frames` (0-based), read through the index."""
+    if offsets is None:
+        offsets = frame_index(filename)
+    if offsets[-1] == 0 or len(frames) == 0:
+        return
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for k in frames:
+                yield mm[offsets[k]:offsets[k + 1]]
+
+
+def read_xyz_range(filename, frames):
+    """read_xyz() for the selected frames (0-based) only."""
+    return parse_xyz(b"".join(iter_frame_bytes(filename, frames)), filename)
+
+
+def stream_frames(filename):
+    """
+    Raw text of each frame of an XYZ file, read line by line so memory use
+    does not grow with the file. Works on compressed files too.
+    """
+    with open_log(filename, binary=True) as f:
+        offset = 0
+        while True:
+            header = f.readline()
+            if not header.strip():
+                return
+            try:
+                natoms = int(header)
+            except ValueError:
+                warnings.warn(f"Could not read atom count at byte {offset}")
+                return
+            lines = [header] + [f.readline() for _ in range(natoms + 1)]
+            if not lines[-1]:
+                warnings.warn(f"Incomplete frame at byte {offset}")
+                return
+            frame = b"".join(lines)
+            offset += len(frame)
+            yield frame
+
+
+# Output layouts of FrameWriter
+frame_layouts = ("files", "shards", "tar", "zip")
+
+
+class FrameWriter:
+    """
+    Destination for many small XYZ files: one file each in a directory
+    ("files"), subdirectories of `shard_size` files ("shards"), or a single
+    tar or zip archive. Archives are written through a large buffer, so
+    tens of thousands of frames cost one file on the file system instead
+    of one metadata operation each.
+    """
+
+    def __init__(self, path, layout="files", shard_size=1000, buffer_size=1 << 22):
+        if layout not in frame_layouts:
+            raise ValueError(f"Unknown layout {layout!r}, expected one of {', '.join(frame_layouts)}")
+        if shard_size < 1:
+            raise ValueError(f"shard_size must be at least 1, got {shard_size}")
+        self.path = path
+        self.layout = layout
+        self.shard_size = shard_size
+        self.count = 0
+        self.archive = None
+        if layout in ("files", "shards"):
+            os.makedirs(path, exist_ok=True)
+            return
+
+        self.file = open(path, "wb", buffering=buffer_size)
+        if layout == "tar":
+            mode = "w:gz" if path.endswith((".tgz", ".tar.gz")) else "w"
+            self.archive = tarfile.open(fileobj=self.file, mode=mode)
+        else:
+            self.archive = zipfile.ZipFile(self.file, "w", zipfile.ZIP_STORED)
+
+    def write(self, name, data):
+        if self.layout == "files":
+            target = os.path.join(self.path, name)
+        elif self.layout == "shards":
+            shard = os.path.join(self.path, f"{self.count // self.shard_size:04d}")
+            if self.count % self.shard_size == 0:
+                os.makedirs(shard, exist_ok=True)
+            target = os.path.join(shard, name)
+
+        if self.layout == "tar":
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self.archive.addfile(info, io.BytesIO(data))
+        elif self.layout == "zip":
+            self.archive.writestr(name, bytes(data))
+        else:
+            with open(target, "wb") as out:
+                out.write(data)
+        self.count += 1
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_xyz_members(path, pattern="*.xyz"):
+    """
+    (name, text) of every file matching `pattern` in a tar or zip archive,
+    or anywhere below a (sharded) directory. Tar archives are read as a
+    stream and come in archive order, everything else in name order.
+    """
+    if os.path.isdir(path):
+        found = []
+        for root, dirs, files in os.walk(path):
+            found += [os.path.join(root, f) for f in files if fnmatch.fnmatch(f, pattern)]
+        for member in sorted(found, key=os.path.basename):
+            with open(member, "rb") as f:
+                yield os.path.basename(member), f.read()
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in sorted(archive.namelist()):
+                if fnmatch.fnmatch(os.path.basename(name), pattern):
+                    yield os.path.basename(name), archive.read(name)
+    else:
+        with tarfile.open(path, "r|*") as archive:
+            for member in archive:
+                if member.isfile() and fnmatch.fnmatch(os.path.basename(member.name), pattern):
+                    yield os.path.basename(member.name), archive.extractfile(member).read()
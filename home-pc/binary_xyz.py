@@ -0,0 +1,153 @@
+"""
+Compact binary container for conformer libraries and trajectories (.xyzb).
+
+Layout, all little-endian:
+
+    header      magic, version, bytes per coordinate (4 or 8), natoms,
+                nframes, and the byte lengths of the two text tables
+    elements    element table as space-separated symbols, then one uint16
+                per atom indexing into it
+    sources     source file names, newline-separated
+    energies    float64 per frame, NaN when unknown
+    source ids  int32 per frame indexing into the sources, -1 when unknown
+    coords      float32 or float64, (nframes, natoms, 3), in Angstrom
+
+The energies, source ids and coordinates start on 8-byte boundaries, so
+the coordinates are read with np.memmap and only the frames that are used
+are ever loaded.
+"""
+import re
+import struct
+
+import numpy as np
+
+from xyz_io import read_xyz
+
+MAGIC = b"XYZB\x00\r\n\x1a"
+VERSION = 1
+
+header_struct = struct.Struct("<8sHHIQQQ")
+
+# energy in an XYZ comment line: labelled ("energy: -12.34 gnorm: ..." from xtb,
+# "E = -76.32", "... E -76.32" from ORCA trajectories) or the whole comment (CREST)
+number = r"(-?\d+\.?\d*(?:[eE][-+]?\d+)?)"
+comment_energy_re = re.compile(r"(?:\b[Ee]nergy\s*[:=]?|\bE\s*=?)\s*" + number + r"(?![\w.])")
+bare_energy_re = re.compile(r"\s*" + number + r"\s*")
+
+
+def aligned(offset):
+    return (offset + 7) // 8 * 8
+
+
+def section_offsets(natoms, nframes, table_bytes, sources_bytes):
+    """Byte offsets of the atom element ids, energies, source ids and coordinates."""
+    elements = header_struct.size + table_bytes
+    sources = elements + 2 * natoms
+    energies = aligned(sources + sources_bytes)
+    source_ids = energies + 8 * nframes
+    coords = aligned(source_ids + 4 * nframes)
+    return elements, sources, energies, source_ids, coords
+
+
+def write_xyzb(filename, symbols, coords, energies=None, sources=None, dtype=np.float32):
+    """
+    Write frames (nframes, natoms, 3) to a .xyzb file. `sources` is one
+    file name for all frames or one per frame; `energies` one per frame.
+    """
+    coords = np.asarray(coords, dtype=dtype)
+    if coords.ndim == 2:
+        coords = coords[None]
+    nframes, natoms, _ = coords.shape
+
+    table, element_ids = np.unique(np.asarray(symbols, dtype=str), return_inverse=True)
+    table_text = " ".join(table).encode()
+
+    if sources is None or isinstance(sources, str):
+        sources = [sources] * nframes
+    names = sorted({s for s in sources if s is not None})
+    lookup = {name: i for i, name in enumerate(names)}
+    source_ids = np.array([lookup.get(s, -1) for s in sources], dtype="<i4")
+    sources_text = "\n".join(names).encode()
+
+    if energies is None:
+        energies = np.full(nframes, np.nan)
+    energies = np.asarray([np.nan if e is None else e for e in energies], dtype="<f8")
+
+    offsets = section_offsets(natoms, nframes, len(table_text), len(sources_text))
+    with open(filename, "wb") as f:
+        f.write(header_struct.pack(MAGIC, VERSION, coords.itemsize, natoms, nframes,
+                                   len(table_text), len(sources_text)))
+        f.write(table_text)
+        f.write(element_ids.astype("<u2").tobytes())
+        f.write(sources_text)
+        f.write(b"\0" * (offsets[2] - f.tell()))
+        f.write(energies.tobytes())
+        f.write(source_ids.tobytes())
+        f.write(b"\0" * (offsets[4] - f.tell()))
+        coords.astype(coords.dtype.newbyteorder("<"), copy=False).tofile(f)
+
+
+def read_xyzb(filename):
+    """
+    (symbols, coords, energies, sources) of a .xyzb file. coords is a
+    read-only np.memmap of shape (nframes, natoms, 3); sources holds the
+    source file name of each frame, or None.
+    """
+    with open(filename, "rb") as f:
+        magic, version, float_bytes, natoms, nframes, table_bytes, sources_bytes = \
+            header_struct.unpack(f.read(header_struct.size))
+        if magic != MAGIC:
+            raise RuntimeError(f"❌ {filename} is not a .xyzb file")
+        if version > VERSION:
+            raise RuntimeError(f"❌ {filename} was written by a newer version (format {version})")
+
+        table = f.read(table_bytes).decode().split()
+        element_ids = np.frombuffer(f.read(2 * natoms), dtype="<u2")
+        names = f.read(sources_bytes).decode().split("\n") if sources_bytes else []
+        offsets = section_offsets(natoms, nframes, table_bytes, sources_bytes)
+        f.seek(offsets[2])
+        energies = np.frombuffer(f.read(8 * nframes), dtype="<f8")
+        source_ids = np.frombuffer(f.read(4 * nframes), dtype="<i4")
+
+    symbols = np.array(table)[element_ids] if natoms else np.array([], dtype=str)
+    sources = [names[i] if i >= 0 else None for i in source_ids]
+    dtype = np.dtype(f"<f{float_bytes}")
+    if nframes and natoms:
+        coords = np.memmap(filename, dtype=dtype, mode="r", offset=offsets[4], shape=(nframes, natoms, 3))
+    else:
+        coords = np.empty((nframes, natoms, 3), dtype=dtype)
+    return symbols, coords, energies, sources
+
+
+def comment_energies(comments):
+    """
+    Energies found in XYZ comment lines, NaN where there is none.
+
+    >>> comment_energies([" energy: -12.345678 gnorm: 0.000123 xtb: 6.5.1 (579679a)",
+    ...                   "  -12.34567890", "E = -76.32  from a.xyz", "step 3"]).tolist()
+    [-12.345678, -12.3456789, -76.32, nan]
+    """
+    energies = []
+    for comment in comments:
+        match = comment_energy_re.search(comment) or bare_energy_re.fullmatch(comment)
+        energies.append(float(match.group(1)) if match else np.nan)
+    return np.array(energies)
+
+
+def xyz_to_xyzb(xyz_file, xyzb_file, dtype=np.float32):
+    symbols, coords, comments = read_xyz(xyz_file)
+    write_xyzb(xyzb_file, symbols, coords, comment_energies(comments), xyz_file, dtype)
+    return len(coords)
+
+
+def xyzb_comments(energies, sources):
+    """XYZ comment lines carrying the energy and source of each frame."""
+    comments = []
+    for energy, source in zip(energies, sources):
+        parts = []
+        if not np.isnan(energy):
+            parts.append(f"E = {energy:.10f}")
+        if source:
+            parts.append(f"from {source}")
+        comments.append("  ".join(parts))
+    return comments
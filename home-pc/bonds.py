@@ -0,0 +1,162 @@
+"""
+Connectivity and ring perception from Cartesian coordinates.
+
+Two atoms are bonded when they are closer than the sum of their covalent
+radii plus a tolerance. Candidate pairs come from a k-d tree neighbour
+search, so the cost grows linearly with the number of atoms instead of
+with the full distance matrix. Rings are the shortest cycle through each
+ring bond, found by a breadth-first search limited to the largest ring
+size of interest; atoms that cannot be on a cycle are pruned first.
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Cordero et al., Dalton Trans. 2008, 2832 (Angstrom; sp3 C, low-spin Mn, Fe, Co)
+covalent_radii = {
+    "H": 0.31, "He": 0.28,
+    "Li": 1.28, "Be": 0.96, "B": 0.84, "C": 0.76, "N": 0.71, "O": 0.66, "F": 0.57, "Ne": 0.58,
+    "Na": 1.66, "Mg": 1.41, "Al": 1.21, "Si": 1.11, "P": 1.07, "S": 1.05, "Cl": 1.02, "Ar": 1.06,
+    "K": 2.03, "Ca": 1.76, "Sc": 1.70, "Ti": 1.60, "V": 1.53, "Cr": 1.39, "Mn": 1.39, "Fe": 1.32,
+    "Co": 1.26, "Ni": 1.24, "Cu": 1.32, "Zn": 1.22, "Ga": 1.22, "Ge": 1.20, "As": 1.19, "Se": 1.20,
+    "Br": 1.20, "Kr": 1.16,
+    "Rb": 2.20, "Sr": 1.95, "Y": 1.90, "Zr": 1.75, "Nb": 1.64, "Mo": 1.54, "Tc": 1.47, "Ru": 1.46,
+    "Rh": 1.42, "Pd": 1.39, "Ag": 1.45, "Cd": 1.44, "In": 1.42, "Sn": 1.39, "Sb": 1.39, "Te": 1.38,
+    "I": 1.39, "Xe": 1.40,
+}
+
+
+def radii_of(symbols):
+    try:
+        return np.array([covalent_radii[s.capitalize()] for s in symbols])
+    except KeyError as e:
+        raise RuntimeError(f"❌ No covalent radius for element {e.args[0]}")
+
+
+def bond_pairs(symbols, coords, tolerance=0.4):
+    """
+    Bonded atom pairs (nbonds, 2), i < j, of one geometry (natoms, 3).
+    """
+    coords = np.asarray(coords, dtype=float)
+    radii = radii_of(symbols)
+    if len(coords) < 2:
+        return np.empty((0, 2), dtype=int)
+    pairs = cKDTree(coords).query_pairs(2 * radii.max() + tolerance, output_type="ndarray")
+    i, j = pairs[:, 0], pairs[:, 1]
+    distance = np.linalg.norm(coords[i] - coords[j], axis=1)
+    pairs = pairs[distance <= radii[i] + radii[j] + tolerance]
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def neighbour_lists(pairs, natoms):
+    """Bonded neighbours of every atom, as a list of lists."""
+    pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+    both = np.concatenate([pairs, pairs[:, ::-1]])
+    both = both[np.lexsort((both[:, 1], both[:, 0]))]
+    counts = np.bincount(both[:, 0], minlength=natoms)
+    return [n.tolist() for n in np.split(both[:, 1], np.cumsum(counts)[:-1])] if natoms else []
+
+
+def cycle_atoms(neighbours):
+    """Mask of the atoms left after repeatedly stripping atoms with one neighbour or none."""
+    degree = np.array([len(n) for n in neighbours])
+    alive = np.ones(len(neighbours), dtype=bool)
+    leaves = list(np.flatnonzero(degree < 2))
+    while leaves:
+        atom = leaves.pop()
+        if not alive[atom]:
+            continue
+        alive[atom] = False
+        for other in neighbours[atom]:
+            degree[other] -= 1
+            if alive[other] and degree[other] < 2:
+                leaves.append(other)
+    return alive
+
+
+def shortest_path(neighbours, start, goal, alive, max_length):
+    """Atoms on a shortest path start -> goal that does not use the direct bond, or None."""
+    parent = {start: None}
+    frontier = [start]
+    for _ in range(max_length):
+        following = []
+        for atom in frontier:
+            for other in neighbours[atom]:
+                if other in parent or not alive[other] or (atom == start and other == goal):
+                    continue
+                parent[other] = atom
+                if other == goal:
+                    path = [goal]
+                    while parent[path[-1]] is not None:
+                        path.append(parent[path[-1]])
+                    return path[::-1]
+                following.append(other)
+        frontier = following
+    return None
+
+
+def find_rings(pairs, natoms, max_size=8):
+    """
+    Rings of up to `max_size` atoms, each as a list of atom indices in
+    ring order: the smallest ring through every ring bond.
+    """
+    neighbours = neighbour_lists(pairs, natoms)
+    alive = cycle_atoms(neighbours)
+    rings, seen = [], set()
+    for i, j in np.asarray(pairs, dtype=int).reshape(-1, 2).tolist():
+        if not (alive[i] and alive[j]):
+            continue
+        path = shortest_path(neighbours, i, j, alive, max_size - 1)
+        if path is None:
+            continue
+        key = frozenset(path)
+        if key not in seen:
+            seen.add(key)
+            rings.append(path)
+    return sorted(rings, key=lambda ring: (len(ring), min(ring)))
+
+
+def reference_atoms(symbols, coords, pairs=None, max_size=8):
+    """
+    Reference ring and X–H bond for aligning a molecule.
+
+    The X–H bond is a hydrogen on a heteroatom (on a carbon if there is
+    none). The ring is, in order of preference, one that contains X, one
+    that X is bonded to, or any other; six-membered rings are preferred.
+    Ties go to the lowest atom indices.
+
+    Returns (ring_indices, [x, h]).
+    """
+    symbols = [s.capitalize() for s in symbols]
+    if pairs is None:
+        pairs = bond_pairs(symbols, coords)
+    rings = find_rings(pairs, len(symbols), max_size)
+    if not rings:
+        raise RuntimeError("❌ No ring found to align on")
+
+    pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+    xh = [(j, i) if symbols[i] == "H" else (i, j) for i, j in pairs.tolist()
+          if (symbols[i] == "H") != (symbols[j] == "H")]
+    if not xh:
+        raise RuntimeError("❌ No X–H bond found to align on")
+    hetero = [(x, h) for x, h in xh if symbols[x] != "C"]
+    xh = hetero or xh
+
+    neighbours = neighbour_lists(pairs, len(symbols))
+    rings_of = [[] for _ in symbols]
+    for ring in rings:
+        for atom in ring:
+            rings_of[atom].append(ring)
+
+    def preference(place, ring, bond):
+        return (place, len(ring) != 6, min(ring), bond), ring
+
+    # only rings next to an X–H bond are looked at, plus the best ring anywhere
+    first = min(xh)
+    best = min((preference(2, ring, first) for ring in rings), key=lambda choice: choice[0])
+    for x, h in xh:
+        candidates = [preference(0, ring, (x, h)) for ring in rings_of[x]]
+        candidates += [preference(1, ring, (x, h)) for atom in neighbours[x] for ring in rings_of[atom]]
+        best = min(candidates + [best], key=lambda choice: choice[0])
+    (_, _, _, bond), ring = best
+    # in index order, so that the sign of the ring normal does not depend on the search
+    return sorted(ring), list(bond)
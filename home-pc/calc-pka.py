@@ -1,7 +1,19 @@
 #!/usr/bin/env python3
 import argparse
-import re
+import csv
 import math
+import os
+import sys
+
+import numpy as np
+
+from harvest import harvest_logs
+from log_cache import cached_scan, open_cache
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
 
 # Constants
 HARTREE_TO_KCAL_MOL = 627.509
@@ -12,16 +24,13 @@ RTln10 = 2.303 * R * T  # kcal/mol
 # Use experimental solvated Gibbs free energy of proton
 G_PROTON = -270.49 # kcal/mol
 
-def extract_gibbs_energy(filename):
+def extract_gibbs_energy(filename, cache=None):
     """
     Extract the final Gibbs free energy from an ORCA output file.
     """
-    with open(filename, 'r') as f:
-        for line in f:
-            if "Final Gibbs free energy" in line:
-                match = re.search(r"([-]?\d+\.\d+)\s+Eh", line)
-                if match:
-                    return float(match.group(1))
+    g = cached_scan(filename, cache, start="Final Gibbs free energy")["G(final)"]
+    if g is not None:
+        return g
     raise ValueError(f"Gibbs free energy not found in {filename}")
 
 def compute_pka(ha, a):
@@ -32,15 +41,148 @@ def compute_pka(ha, a):
     pka = delta_g / (2.303 * R * T)
     return pka, delta_g
 
+def compute_pka_isodesmic(ha, a, ref_ha, ref_a, ref_pka):
+    """
+    pKa from the exchange HA + Ref- <-> A- + HRef against a reference acid
+    of known pKa, which cancels the proton free energy and much of the
+    solvation error.
+    """
+    delta_g = (a + ref_ha - ha - ref_a) * HARTREE_TO_KCAL_MOL
+    pka = ref_pka + delta_g / (2.303 * R * T)
+    return pka, delta_g
+
+def read_manifest(filename):
+    """
+    Acid/base pairs from a CSV or YAML manifest, as a list of dicts with the
+    keys "name", "ha", "a" and optionally "ref_ha", "ref_a", "ref_pka".
+
+    A CSV manifest has a header row with those column names. A YAML manifest
+    is either a list of such mappings or a mapping with a "pairs" list and a
+    "reference" mapping (ha, a, pka) used for every pair without its own.
+    Log paths are relative to the manifest.
+    """
+    if filename.endswith((".yaml", ".yml")):
+        if yaml is None:
+            raise RuntimeError("❌ Reading YAML manifests needs PyYAML (pip install pyyaml)")
+        with open(filename) as f:
+            doc = yaml.safe_load(f)
+        pairs = doc.get("pairs", []) if isinstance(doc, dict) else doc
+        reference = doc.get("reference") if isinstance(doc, dict) else None
+        if reference:
+            for pair in pairs:
+                pair.setdefault("ref_ha", reference["ha"])
+                pair.setdefault("ref_a", reference["a"])
+                pair.setdefault("ref_pka", reference["pka"])
+    else:
+        with open(filename, newline="") as f:
+            pairs = [{k.strip(): (v.strip() if v else v) for k, v in row.items()} for row in csv.DictReader(f)]
+
+    base = os.path.dirname(filename)
+    for i, pair in enumerate(pairs):
+        if not pair.get("name"):
+            pair["name"] = os.path.splitext(os.path.basename(str(pair.get("ha") or "")))[0] or f"pair{i + 1}"
+        given = [pair.get(key) not in (None, "") for key in ("ref_ha", "ref_a", "ref_pka")]
+        if not (pair.get("ha") and pair.get("a")):
+            raise RuntimeError(f"❌ Row {i + 1} ({pair['name']}) of {filename}: ha and a are required")
+        if any(given) and not all(given):
+            raise RuntimeError(f"❌ Row {i + 1} ({pair['name']}) of {filename}: "
+                               "ref_ha, ref_a and ref_pka must be given together")
+        for key in ("ha", "a", "ref_ha", "ref_a"):
+            if pair.get(key):
+                pair[key] = os.path.join(base, str(pair[key]))
+    return pairs
+
+def batch_pka(pairs, cache=None, jobs=None, ref=None):
+    """
+    pKa of every pair in the manifest. Each distinct log is parsed once, in
+    parallel, and all pKa values are computed as array operations. `ref` is
+    a default (ha, a, pka) reference acid for pairs without their own.
+    Returns a list of result rows and a list of (filename, message) errors.
+    """
+    for pair in pairs:
+        if ref and not pair.get("ref_ha"):
+            pair["ref_ha"], pair["ref_a"], pair["ref_pka"] = ref
+
+    files = sorted({pair[key] for pair in pairs for key in ("ha", "a", "ref_ha", "ref_a") if pair.get(key)})
+    logs, errors = harvest_logs(files, cache, start="Final Gibbs free energy", jobs=jobs)
+
+    g = np.full(len(files) + 1, np.nan)  # last slot for pairs without a reference
+    for i, (f, log) in enumerate(zip(files, logs)):
+        if log is not None and log["G(final)"] is None:
+            errors.append((f, "Gibbs free energy not found"))
+        elif log is not None:
+            g[i] = log["G(final)"]
+
+    slot = {f: i for i, f in enumerate(files)}
+    def column(key):
+        return g[[slot.get(pair.get(key), len(files)) for pair in pairs]]
+
+    ha, a = column("ha"), column("a")
+    pka, delta_g = compute_pka(ha, a)
+    ref_pka = np.array([float(pair["ref_pka"]) if pair.get("ref_ha") else np.nan for pair in pairs])
+    iso_pka, iso_delta_g = compute_pka_isodesmic(ha, a, column("ref_ha"), column("ref_a"), ref_pka)
+
+    rows = []
+    for k, pair in enumerate(pairs):
+        rows.append({
+            "Name": pair["name"],
+            "G(HA)": ha[k],
+            "G(A-)": a[k],
+            "ΔG (kcal/mol)": delta_g[k],
+            "pKa": pka[k],
+            "ΔG(iso) (kcal/mol)": iso_delta_g[k],
+            "pKa(iso)": iso_pka[k],
+        })
+    return rows, errors
+
+def print_batch(rows):
+    headers = ["Name", "G(HA)", "G(A-)", "ΔG (kcal/mol)", "pKa", "ΔG(iso) (kcal/mol)", "pKa(iso)"]
+    formats = [str, "{:.8f}".format, "{:.8f}".format, "{:.3f}".format, "{:.2f}".format, "{:.3f}".format, "{:.2f}".format]
+    if all(math.isnan(row["pKa(iso)"]) for row in rows):
+        headers, formats = headers[:5], formats[:5]
+    print("\t".join(headers))
+    for row in rows:
+        cells = [fmt(row[h]) for h, fmt in zip(headers, formats)]
+        print("\t".join("" if c == "nan" else c for c in cells))
+
 def main():
     parser = argparse.ArgumentParser(description="Calculate solution-phase pKa from ORCA log files.")
-    parser.add_argument('--ha', required=True, help="ORCA log file for HA (protonated acid)")
-    parser.add_argument('--a', required=True, help="ORCA log file for A- (deprotonated base)")
+    parser.add_argument('--ha', help="ORCA log file for HA (protonated acid)")
+    parser.add_argument('--a', help="ORCA log file for A- (deprotonated base)")
+    parser.add_argument('--batch', metavar="MANIFEST",
+                        help="CSV or YAML manifest of acid/base pairs (columns: name, ha, a[, ref_ha, ref_a, ref_pka])")
+    parser.add_argument('--ref-ha', help="Reference acid HRef log for the isodesmic scheme")
+    parser.add_argument('--ref-a', help="Reference base Ref- log for the isodesmic scheme")
+    parser.add_argument('--ref-pka', type=float, help="Experimental pKa of the reference acid")
+    parser.add_argument('-j', '--jobs', type=int, help="Number of parser processes for --batch (default: all available cores)")
+    parser.add_argument('--no-cache', action='store_true', help="Parse the logs again instead of using the results cache")
 
     args = parser.parse_args()
+    ref = (args.ref_ha, args.ref_a, args.ref_pka)
+    if any(v is not None for v in ref) and not all(v is not None for v in ref):
+        parser.error("--ref-ha, --ref-a and --ref-pka must be given together")
+
+    cache = None if args.no_cache else open_cache()
 
-    ha = extract_gibbs_energy(args.ha)
-    a = extract_gibbs_energy(args.a)
+    if args.batch:
+        try:
+            pairs = read_manifest(args.batch)
+        except RuntimeError as e:
+            print(e)
+            sys.exit(1)
+        rows, errors = batch_pka(pairs, cache, args.jobs, ref if args.ref_ha else None)
+        print_batch(rows)
+        if errors:
+            print(f"\n⚠️ Failed to read {len(errors)} file(s):")
+            for f, message in errors:
+                print(f"  {f}: {message}")
+        return
+
+    if not (args.ha and args.a):
+        parser.error("--ha and --a are required without --batch")
+
+    ha = extract_gibbs_energy(args.ha, cache)
+    a = extract_gibbs_energy(args.a, cache)
     print(f"G(ha) = {ha} Ha")
     print(f"G(a)  = {a} Ha")
 
@@ -49,5 +191,12 @@ def main():
     print(f"ΔG = {delta_g_kcal:.3f} kcal/mol")
     print(f"pKa = {pka:.2f}")
 
+    if args.ref_ha:
+        ref_ha = extract_gibbs_energy(args.ref_ha, cache)
+        ref_a = extract_gibbs_energy(args.ref_a, cache)
+        iso_pka, iso_delta_g = compute_pka_isodesmic(ha, a, ref_ha, ref_a, args.ref_pka)
+        print(f"ΔG(iso) = {iso_delta_g:.3f} kcal/mol")
+        print(f"pKa(iso) = {iso_pka:.2f}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import argparse
+
+import numpy as np
+
+from binary_xyz import comment_energies, read_xyzb, write_xyzb, xyzb_comments
+from orca_log import compressed_suffixes
+from trajectory import extract_trajectory
+from xyz_io import read_xyz, write_xyz
+
+def base_name(filename):
+    for suffix in compressed_suffixes:
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)]
+    return filename
+
+def load_frames(filename):
+    """(symbols, coords, energies, sources) of an .xyzb, XYZ or ORCA/Psi4 log file."""
+    name = base_name(filename)
+    if name.endswith(".xyzb"):
+        return read_xyzb(filename)
+    if name.endswith(".xyz"):
+        symbols, coords, comments = read_xyz(filename)
+        return symbols, coords, comment_energies(comments), [filename] * len(coords)
+    symbols, coords, energies = extract_trajectory(filename)
+    return symbols, coords, energies, [filename] * len(coords)
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert between XYZ, binary .xyzb and optimization logs")
+    parser.add_argument("input", help="Input .xyz, .xyzb or ORCA/Psi4 log (compressed files allowed)")
+    parser.add_argument("output", help="Output file; .xyzb writes the binary format, anything else XYZ")
+    parser.add_argument("--float64", action="store_true", help="Store double precision coordinates in .xyzb (default: float32)")
+    args = parser.parse_args()
+
+    symbols, coords, energies, sources = load_frames(args.input)
+    if args.output.endswith(".xyzb"):
+        dtype = np.float64 if args.float64 else np.float32
+        write_xyzb(args.output, symbols, coords, energies, sources, dtype)
+    else:
+        if energies is None:
+            energies = np.full(len(coords), np.nan)
+        write_xyz(args.output, symbols, coords, xyzb_comments(energies, sources))
+    print(f"✅ {len(coords)} frames of {len(symbols)} atoms written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,18 @@
 #!/usr/bin/env python3
 
-import re
-import glob
-from pathlib import Path
+import argparse
+import os
+
+import numpy as np
+
+from harvest import harvest_logs, walk_logs
+from log_cache import open_cache
+from orca_log import compressed_suffixes
+from thermo import boltzmann_ensemble
 
 HARTREE_TO_KCAL = 627.509
 
-def extract_thermo_data(filepath):
-    with open(filepath) as f:
-        lines = f.readlines()
-
-    data = {
-        "File": Path(filepath).name,
-        "E(electronic)": None,
-        "ZPE": None,
-        "Thermal Energy": None,
-        "Entropy Corr": None,
-        "G(final)": None
-    }
-
-    try:
-        data["E(electronic)"] = float([line for line in lines if "FINAL SINGLE POINT ENERGY" in line][-1].split()[-1])
-    except IndexError:
-        pass
-
-    for line in lines:
-        if "Zero point energy" in line:
-            match = re.search(r'([-+]?\d+\.\d+)\s+Eh', line)
-            if match:
-                data["ZPE"] = float(match.group(1))
-        elif "Total thermal energy" in line and "..." in line:
-            try:
-                data["Thermal Energy"] = float(line.split()[-2])
-            except Exception:
-                pass
-        elif "Total entropy correction" in line:
-            match = re.search(r'([-+]?\d+\.\d+)\s+Eh', line)
-            if match:
-                data["Entropy Corr"] = float(match.group(1))
-        elif "Final Gibbs free energy" in line:
-            match = re.search(r'([-+]?\d+\.\d+)', line)
-            if match:
-                data["G(final)"] = float(match.group(1))
-    return data
+thermo_keys = ["File", "E(electronic)", "ZPE", "Thermal Energy", "Entropy Corr", "G(final)"]
 
 def print_table(data_list, headers, title=None):
     if title:
@@ -52,20 +22,97 @@ def print_table(data_list, headers, title=None):
         row = [str(entry.get(h, "")) for h in headers]
         print("\t".join(row))
 
+def conformer_group(filename, sep="_"):
+    """
+    Molecule a conformer log belongs to: its directory and its name up to
+    the last `sep`, so that conf_1.log in two directories stays apart.
+    """
+    folder, name = os.path.split(filename)
+    for suffix in compressed_suffixes:
+        name = name.removesuffix(suffix)
+    stem = os.path.splitext(name)[0]
+    return os.path.join(folder, stem.rsplit(sep, 1)[0] if sep in stem else stem)
+
+def parse_list(text):
+    return [float(v) for v in text.split(",")]
+
+def print_ensembles(results, temperature, sep, windows, cutoffs):
+    data = [d for d in results if d["G(final)"] is not None]
+    if not data:
+        return
+    g = np.array([d["G(final)"] for d in data])
+    # with -r the File column is the path relative to the search root
+    groups = [conformer_group(d["File"], sep) for d in data]
+    ens = boltzmann_ensemble(g, groups, temperature)
+
+    rel = ens["Relative Energy"] * HARTREE_TO_KCAL
+    for d, group, de, p, cum in zip(data, groups, rel, ens["Population"], ens["Cumulative Population"]):
+        d["Group"] = group
+        d["ΔG (kcal/mol)"] = round(de, 4)
+        d["Population"] = f"{p:.4f}"
+        d["Cumulative"] = f"{cum:.4f}"
+
+    # conformers of each molecule, lowest first
+    order = np.lexsort((rel, ens["Group"]))
+    print_table([data[i] for i in order], ["Group", "File", "G(final)", "ΔG (kcal/mol)", "Population", "Cumulative"],
+                title=f"Boltzmann Populations at {temperature:.2f} K")
+
+    # conformers within each energy window, and needed to reach each cumulative population
+    ngroups = len(ens["Labels"])
+    index = ens["Group"]
+    before = ens["Cumulative Population"] - ens["Population"]
+    within = [np.bincount(index, weights=rel <= w, minlength=ngroups) for w in windows]
+    needed = [np.bincount(index, weights=before < c - 1e-12, minlength=ngroups) for c in cutoffs]
+
+    headers = (["Group", "Conformers", "G(min)", "<G>", "G(ensemble)"]
+               + [f"≤{w:g} kcal/mol" for w in windows]
+               + [f"{100 * c:g}% pop." for c in cutoffs])
+    rows = []
+    for k, label in enumerate(ens["Labels"]):
+        row = {
+            "Group": label,
+            "Conformers": ens["Count"][k],
+            "G(min)": f"{ens['Minimum'][k]:.6f}",
+            "<G>": f"{ens['Average'][k]:.6f}",
+            "G(ensemble)": f"{ens['Ensemble'][k]:.6f}",
+        }
+        row.update({h: int(n[k]) for h, n in zip(headers[5:], within + needed)})
+        rows.append(row)
+    print_table(rows, headers, title="Conformer Ensembles (Eh; window and population columns count conformers)")
+
 def main():
-    files = sorted(glob.glob("*.log"))
+    parser = argparse.ArgumentParser(description="Tabulate thermodynamic data from all ORCA logs in the current directory.")
+    parser.add_argument("root", nargs="?", default=".", help="Directory to search for .log files (default: current)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Also search all subdirectories")
+    parser.add_argument("-j", "--jobs", type=int, help="Number of parser processes (default: all available cores)")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every log again instead of using the results cache")
+    parser.add_argument("--ensemble", action="store_true",
+                        help="Boltzmann-weight the conformers of each molecule, grouped by file name prefix")
+    parser.add_argument("--temperature", type=float, default=298.15, help="Temperature in K for --ensemble (default: 298.15)")
+    parser.add_argument("--group-sep", default="_",
+                        help="Conformers share the file name up to the last occurrence of this separator (default: _)")
+    parser.add_argument("--windows", default="1,2,3", help="Energy windows in kcal/mol for --ensemble (default: 1,2,3)")
+    parser.add_argument("--cutoffs", default="0.9,0.95,0.99",
+                        help="Cumulative population cut-offs for --ensemble (default: 0.9,0.95,0.99)")
+    args = parser.parse_args()
+
+    files = walk_logs(args.root, recursive=args.recursive)
     if not files:
         print("❌ No .log files found.")
         return
 
-    headers = ["File", "E(electronic)", "ZPE", "Thermal Energy", "Entropy Corr", "G(final)"]
-    results = []
+    headers = thermo_keys
+    cache = None if args.no_cache else open_cache()
+    logs, errors = harvest_logs(files, cache, start="FINAL SINGLE POINT ENERGY", jobs=args.jobs)
 
-    for f in files:
-        try:
-            results.append(extract_thermo_data(f))
-        except Exception as e:
-            print(f"⚠️ Failed to parse {f}: {e}")
+    results = []
+    for f, log in zip(files, logs):
+        if log is None:
+            continue
+        data = {key: log[key] for key in thermo_keys}
+        if args.recursive:
+            data["File"] = os.path.relpath(f, args.root)
+        results.append(data)
 
     print_table(results, headers, title="Thermodynamic Data Table (tab-separated for Google Docs)")
 
@@ -80,5 +127,13 @@ def main():
         rel_headers = ["File", "G(final)", "ΔG (kcal/mol)"]
         print_table(results, rel_headers, title="Relative Gibbs Free Energies (kcal/mol)")
 
+    if args.ensemble:
+        print_ensembles(results, args.temperature, args.group_sep, parse_list(args.windows), parse_list(args.cutoffs))
+
+    if errors:
+        print(f"\n⚠️ Failed to parse {len(errors)} file(s):")
+        for f, message in errors:
+            print(f"  {f}: {message}")
+
 if __name__ == "__main__":
       main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import os
+import time
+
+from orca_log import LogScanner
+
+labels = {
+    "Energy change": "ΔE",
+    "RMS gradient": "RMSG",
+    "MAX gradient": "MAXG",
+    "RMS step": "RMSS",
+    "MAX step": "MAXS",
+}
+
+def short(value):
+    return "—" if value is None else f"{value:.1e}"
+
+def status_line(name, log):
+    parts = [f"{name:<24}"]
+    if log["Opt Cycle"]:
+        parts.append(f"cycle {log['Opt Cycle']:>3}")
+    if log["SCF Energy"] is not None:
+        parts.append(f"SCF it {log['SCF Iterations']:>3}  E {log['SCF Energy']:.8f}  ΔE {short(log['SCF Delta-E'])}")
+    if log["Convergence"]:
+        flags = " ".join(
+            f"{labels[item]}{'✓' if done else '✗'}" for item, (_, _, done) in log["Convergence"].items()
+        )
+        parts.append(flags)
+    parts.append(f"[{log['Step'] or 'startup'}]")
+    if log["Status"] != "running":
+        parts.append(log["Status"])
+    return "  ".join(parts)
+
+class FollowedLog:
+    """
+    Incremental reader for one growing log. Only bytes appended since the last
+    poll are read; a truncated or replaced file is read again from the start.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.file = None
+        self.inode = None
+        self.offset = 0
+        self.partial = b""
+        self.scanner = LogScanner(path)
+        self.last_status = None
+
+    def reopen(self, st):
+        if self.file:
+            self.file.close()
+        self.file = open(self.path, "rb")
+        self.inode = st.st_ino
+        self.offset = 0
+        self.partial = b""
+        self.scanner = LogScanner(self.path)
+
+    def poll(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if self.file is None or st.st_ino != self.inode or st.st_size < self.offset:
+            self.reopen(st)
+        if st.st_size == self.offset:
+            return False
+
+        self.file.seek(self.offset)
+        chunk = self.file.read(st.st_size - self.offset)
+        self.offset += len(chunk)
+
+        # Hold back an unfinished last line until the rest of it is written
+        data = self.partial + chunk
+        end = data.rfind(b"\n") + 1
+        self.partial = data[end:]
+        for line in data[:end].decode(errors="replace").splitlines(keepends=True):
+            self.scanner.feed(line)
+        return True
+
+    @property
+    def result(self):
+        return self.scanner.result
+
+def main():
+    parser = argparse.ArgumentParser(description="Follow running ORCA jobs and print one status line per job.")
+    parser.add_argument("logs", nargs="*", help="Log files or glob patterns to follow (default: *.log)")
+    parser.add_argument("-i", "--interval", type=float, default=2.0, help="Seconds between polls (default: 2)")
+    parser.add_argument("--once", action="store_true", help="Print the current status of every job and exit")
+    parser.add_argument("--exit-when-done", action="store_true", help="Stop once every job has finished")
+    args = parser.parse_args()
+
+    patterns = args.logs or ["*.log"]
+    followed = {}
+
+    try:
+        while True:
+            # New files matching the patterns are picked up on every poll, like tail -F
+            for pattern in patterns:
+                for path in sorted(glob.glob(pattern)) or [pattern]:
+                    if path not in followed and os.path.isfile(path):
+                        followed[path] = FollowedLog(path)
+
+            for job in followed.values():
+                job.poll()
+                line = status_line(job.name, job.result)
+                if args.once or line != job.last_status:
+                    print(line, flush=True)
+                    job.last_status = line
+
+            if args.once:
+                break
+            if args.exit_when_done and followed and all(
+                    job.result["Status"] in ("finished", "error") for job in followed.values()):
+                print("✅ All jobs finished")
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import numpy as np
+
+from orca_hess import hess_ir_spectrum, parse_mass_args
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute frequencies and IR intensities from an ORCA .hess file")
+    parser.add_argument("hessfile", help="ORCA .hess file of a frequency job")
+    parser.add_argument("--mass", action="append", metavar="ATOM=MASS",
+                        help="Replace a mass by 0-based atom index or element symbol, e.g. H=2.014 or 3=13.003 (repeatable)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Frequency scaling factor (default: 1.0)")
+    parser.add_argument("--output", help="Two-column frequency/intensity file for plot-ir.py (default: <hess>_freqs.dat)")
+    args = parser.parse_args()
+
+    freqs, intensities = hess_ir_spectrum(args.hessfile, parse_mass_args(args.mass), scale=args.scale)
+
+    print("Recomputed Frequencies and Intensities:")
+    for f, i in zip(freqs, intensities):
+        print(f"{f:.2f} cm⁻¹  ->  {i:.4f} km/mol")
+
+    output = args.output or os.path.splitext(args.hessfile)[0] + "_freqs.dat"
+    np.savetxt(output, np.column_stack([freqs, intensities]), fmt="%.4f")
+    print(f"✅ Spectrum sticks written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of parsed ORCA logs.
+
+Parsed results are stored in a SQLite file in the project directory, keyed on
+the log's path together with its size, mtime and inode. A log is only parsed
+again when one of those changes, so finished jobs are read once and logs of
+running jobs are picked up again as soon as they grow.
+
+Run this file directly to inspect or prune the cache.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+from orca_log import scan_log
+
+CACHE_FILE = ".orca-tools-cache.sqlite"
+
+# Bump whenever scan_log starts returning different data for the same log
+CACHE_VERSION = 3
+
+schema = """
+CREATE TABLE IF NOT EXISTS logs (
+    path      TEXT    NOT NULL,
+    mode      TEXT    NOT NULL,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    inode     INTEGER NOT NULL,
+    version   INTEGER NOT NULL,
+    parsed_at REAL    NOT NULL,
+    result    TEXT    NOT NULL,
+    PRIMARY KEY (path, mode)
+)
+"""
+
+
+def open_cache(path=CACHE_FILE):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(schema)
+    return conn
+
+
+def file_identity(st):
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+def cache_lookup(cache, filename, mode=None):
+    """
+    Cached result for `filename` if it is still valid, else None. `mode` is
+    the start marker the log was scanned from, or the name of another parser.
+    """
+    path = os.path.abspath(filename)
+    row = cache.execute(
+        "SELECT size, mtime_ns, inode, version, result FROM logs WHERE path = ? AND mode = ?",
+        (path, mode or "")).fetchone()
+    if row and tuple(row[:3]) == file_identity(os.stat(path)) and row[3] == CACHE_VERSION:
+        return json.loads(row[4])
+    return None
+
+
+def cache_store(cache, filename, mode, identity, result):
+    cache.execute(
+        "INSERT OR REPLACE INTO logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (os.path.abspath(filename), mode or "", *identity, CACHE_VERSION, time.time(), json.dumps(result)))
+
+
+def parse_unchanged(filename, parse):
+    """
+    parse(filename) plus the identity of the file it parsed. The identity is
+    None when a job wrote to the log while it was being parsed: the result is
+    then partial and must not be cached, the next run parses the log again.
+    """
+    before = file_identity(os.stat(filename))
+    result = parse(filename)
+    identity = before if file_identity(os.stat(filename)) == before else None
+    return identity, result
+
+
+def scan_unchanged(filename, start=None):
+    return parse_unchanged(filename, lambda f: scan_log(f, start=start))
+
+
+def cached_parse(filename, cache, mode, parse):
+    """
+    parse(filename) with a lookup in `cache` under `mode` first. Without a
+    cache connection this is a plain parse(filename) call.
+    """
+    if cache is None:
+        return parse(filename)
+
+    result = cache_lookup(cache, filename, mode)
+    if result is None:
+        identity, result = parse_unchanged(filename, parse)
+        if identity is not None:
+            cache_store(cache, filename, mode, identity, result)
+            cache.commit()
+    return result
+
+
+def cached_scan(filename, cache=None, start=None):
+    """scan_log() with a lookup in `cache` first."""
+    return cached_parse(filename, cache, start, lambda f: scan_log(f, start=start))
+
+
+def entry_state(path, size, mtime_ns, inode, version):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "missing"
+    if file_identity(st) != (size, mtime_ns, inode) or version != CACHE_VERSION:
+        return "stale"
+    return "fresh"
+
+
+def cache_entries(cache):
+    rows = cache.execute(
+        "SELECT path, mode, size, mtime_ns, inode, version, parsed_at, length(result) "
+        "FROM logs ORDER BY path, mode")
+    for path, mode, size, mtime_ns, inode, version, parsed_at, nbytes in rows:
+        state = entry_state(path, size, mtime_ns, inode, version)
+        yield path, mode, size, parsed_at, nbytes, state
+
+
+def show_stats(cache, cache_path):
+    counts = {"fresh": 0, "stale": 0, "missing": 0}
+    total = 0
+    for *_, nbytes, state in cache_entries(cache):
+        counts[state] += 1
+        total += nbytes
+    print(f"Cache file: {cache_path} ({os.path.getsize(cache_path) / 1024:.1f} KiB)")
+    print(f"Entries:    {sum(counts.values())} ({total / 1024:.1f} KiB of parsed results)")
+    for state, n in counts.items():
+        print(f"  {state:<8}{n}")
+
+
+def list_entries(cache):
+    print("\t".join(["State", "Mode", "Size", "Parsed", "Path"]))
+    for path, mode, size, parsed_at, _, state in cache_entries(cache):
+        parsed = time.strftime("%Y-%m-%d %H:%M", time.localtime(parsed_at))
+        print("\t".join([state, mode or "full", str(size), parsed, path]))
+
+
+def prune(cache, states, older_than=None):
+    cutoff = time.time() - older_than * 86400 if older_than is not None else None
+    doomed = []
+    for path, mode, _, parsed_at, _, state in cache_entries(cache):
+        if state in states or (cutoff is not None and parsed_at < cutoff):
+            doomed.append((path, mode))
+    cache.executemany("DELETE FROM logs WHERE path = ? AND mode = ?", doomed)
+    cache.commit()
+    cache.execute("VACUUM")
+    print(f"🧹 Removed {len(doomed)} cache entries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or prune the parsed ORCA log cache.")
+    parser.add_argument("--cache", default=CACHE_FILE, help=f"Cache file (default: {CACHE_FILE})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Summarize the cache")
+    sub.add_parser("list", help="List every cached log and whether it is still valid")
+    prune_parser = sub.add_parser("prune", help="Drop entries for missing or changed logs")
+    prune_parser.add_argument("--keep-stale", action="store_true",
+                              help="Only drop entries whose log no longer exists")
+    prune_parser.add_argument("--older-than", type=float, metavar="DAYS",
+                              help="Also drop entries parsed more than DAYS ago")
+    sub.add_parser("clear", help="Drop every entry")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.cache):
+        print(f"❌ No cache found at {args.cache}")
+        return
+
+    cache = open_cache(args.cache)
+    if args.command == "stats":
+        show_stats(cache, args.cache)
+    elif args.command == "list":
+        list_entries(cache)
+    elif args.command == "prune":
+        states = {"missing"} if args.keep_stale else {"missing", "stale"}
+        prune(cache, states, args.older_than)
+    elif args.command == "clear":
+        prune(cache, {"fresh", "stale", "missing"})
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
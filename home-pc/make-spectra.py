@@ -1,46 +1,35 @@
 #!/usr/bin/env python3
 import argparse
-import re
 import numpy as np
 import matplotlib.pyplot as plt
 
-def parse_psi4_log(filename):
-    with open(filename, 'r') as f:
-        lines = f.readlines()
-
-    freqs, intensities = [], []
-    for line in lines:
-        if "Freq" in line and "[cm^-1]" in line:
-            parts = line.split()
-            freq_values = [float(x) for x in parts if re.match(r'^-?\d+\.?\d*$', x)]
-            freqs.extend(freq_values)
-        elif "IR activ" in line:
-            parts = line.split()
-            intensity_values = [float(x) for x in parts if re.match(r'^-?\d+\.?\d*$', x)]
-            intensities.extend(intensity_values)
+from log_cache import cached_parse, open_cache
+from spectra import backends, read_psi4_ir, shapes
+from spectrum_cache import SPECTRUM_CACHE_DIR, cached_broaden
 
+def cached_psi4_log(filename, cache=None):
+    freqs, intensities = cached_parse(filename, cache, "psi4-ir", lambda f: [a.tolist() for a in read_psi4_ir(f)])
     return np.array(freqs), np.array(intensities)
 
-def lorentzian(x, x0, gamma):
-    return (gamma / np.pi) / ((x - x0)**2 + gamma**2)
-
-def broaden_spectrum(freqs, intensities, x_range, gamma):
-    y = np.zeros_like(x_range)
-    for f, inten in zip(freqs, intensities):
-        y += inten * lorentzian(x_range, f, gamma)
-    return y
+def broaden_spectrum(freqs, intensities, x_range, gamma, shape="lorentzian", backend="auto", cache_dir=SPECTRUM_CACHE_DIR):
+    # gamma is the half width at half maximum
+    return cached_broaden(x_range, freqs, intensities, cache_dir, shape=shape, fwhm=2 * gamma, backend=backend)
 
 def main():
     parser = argparse.ArgumentParser(description="Plot IR spectrum from Psi4 log file")
     parser.add_argument("logfile", help="Path to Psi4 log file")
     parser.add_argument("outfile", help="Output image file (e.g., spectrum.pdf or spectrum.png)")
-    parser.add_argument("-g", "--gamma", type=float, default=10.0, help="Lorentzian broadening in cm⁻¹")
+    parser.add_argument("-g", "--gamma", type=float, default=10.0, help="Half width at half maximum of the line shape in cm⁻¹")
+    parser.add_argument("--shape", choices=shapes, default="lorentzian", help="Line shape (default: lorentzian)")
+    parser.add_argument("--backend", choices=backends, default="auto", help="Broadening backend (default: auto)")
+    parser.add_argument("--no-cache", action="store_true", help="Parse and broaden again instead of using the caches")
     args = parser.parse_args()
 
-    freqs, intensities = parse_psi4_log(args.logfile)
+    freqs, intensities = cached_psi4_log(args.logfile, None if args.no_cache else open_cache())
 
     x = np.linspace(min(freqs) - 100, max(freqs) + 100, 5000)
-    y = broaden_spectrum(freqs, intensities, x, args.gamma)
+    y = broaden_spectrum(freqs, intensities, x, args.gamma, args.shape, args.backend,
+                        None if args.no_cache else SPECTRUM_CACHE_DIR)
 
     plt.figure(figsize=(4, 3))
     plt.plot(x, y)
@@ -3,6 +3,8 @@ import re
 import sys
 import os
 
+from orca_log import tail_lines
+
 periodic_table = {
     1: 'H', 6: 'C', 7: 'N', 8: 'O', 9: 'F', 16: 'S', 17: 'Cl', 35: 'Br', 53: 'I'
 }
@@ -15,30 +17,25 @@ logfile = sys.argv[1]
 outfile = os.path.splitext(logfile)[0] + ".xyz"
 
 atoms = []
-current_atoms = []
-
-with open(logfile) as f:
-    lines = f.readlines()
-
-for i, line in enumerate(lines):
-    if "Z (Atomic Numbers)" in line:
-        current_atoms = []
-        for coord_line in lines[i + 1:]:
-            parts = coord_line.strip().split()
-            if len(parts) >= 5:
-                try:
-                    z = int(float(parts[0]))
-                    mass = float(parts[1])
-                    x = float(parts[2]) * 0.529177
-                    y = float(parts[3]) * 0.529177
-                    z_coord = float(parts[4]) * 0.529177
-                    symbol = periodic_table.get(z, f"Z{z}")
-                    current_atoms.append((symbol, x, y, z_coord))
-                except ValueError:
-                    break
-            else:
+
+# Only the last coordinate block matters, so read the log from there on
+lines = tail_lines(logfile, "Z (Atomic Numbers)")
+if next(lines, None) is not None:
+    for coord_line in lines:
+        parts = coord_line.strip().split()
+        if len(parts) >= 5:
+            try:
+                z = int(float(parts[0]))
+                mass = float(parts[1])
+                x = float(parts[2]) * 0.529177
+                y = float(parts[3]) * 0.529177
+                z_coord = float(parts[4]) * 0.529177
+                symbol = periodic_table.get(z, f"Z{z}")
+                atoms.append((symbol, x, y, z_coord))
+            except ValueError:
                 break
-        atoms = current_atoms
+        else:
+            break
 
 with open(outfile, "w") as f:
     f.write(f"{len(atoms)}\n")
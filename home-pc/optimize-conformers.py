@@ -4,9 +4,19 @@ import glob
 import argparse
 import subprocess
 
-def generate_orca_input(xyz_path, method, basis, inp_path, solvent=None, charge=0, multiplicity=1):
-    with open(xyz_path) as f:
-        lines = f.readlines()
+import numpy as np
+
+from binary_xyz import comment_energies
+from dedup import near_duplicates
+from rmsd import heavy_atom_mask
+from xyz_io import iter_xyz_members, parse_xyz, read_xyz_bytes
+
+def generate_orca_input(xyz_path, method, basis, inp_path, solvent=None, charge=0, multiplicity=1, xyz_text=None):
+    if xyz_text is not None:
+        lines = xyz_text.decode().splitlines(keepends=True)
+    else:
+        with open(xyz_path) as f:
+            lines = f.readlines()
 
     try:
         natoms = int(lines[0].strip())
@@ -34,6 +44,28 @@ end
 
     return True
 
+def drop_near_duplicates(xyz_files, threshold, heavy=False):
+    # Files are grouped by their atom list; within a group the lowest-energy
+    # geometry (from the comment line) of each set of near-duplicates is kept
+    groups = {}
+    for k, (xyz_file, xyz_text) in enumerate(xyz_files):
+        try:
+            symbols, coords, comments = parse_xyz(xyz_text if xyz_text is not None else read_xyz_bytes(xyz_file), xyz_file)
+        except (RuntimeError, ValueError):
+            groups.setdefault(None, []).append((k, None, ""))
+            continue
+        groups.setdefault(tuple(symbols), []).append((k, coords[0], comments[0]))
+
+    keep = [k for k, _, _ in groups.pop(None, [])]
+    for symbols, members in groups.items():
+        index = np.array([k for k, _, _ in members])
+        energies = comment_energies([comment for _, _, comment in members])
+        order = np.argsort(np.where(np.isnan(energies), np.inf, energies), kind="stable")
+        mask = heavy_atom_mask(symbols) if heavy else None
+        frames = np.array([coords for _, coords, _ in members])
+        keep.extend(index[near_duplicates(frames, threshold, order, mask)].tolist())
+    return [xyz_files[k] for k in sorted(keep)]
+
 def run_orca(inp_path, orca_path):
     base = os.path.splitext(inp_path)[0]
     log_path = f"{base}.log"
@@ -58,14 +90,28 @@ def main():
     parser.add_argument("--charge", type=int, default=0, help="Molecular charge (default: 0)")
     parser.add_argument("--multiplicity", type=int, default=1, help="Spin multiplicity (default: 1)")
     parser.add_argument("--skip-existing", action="store_true", help="Skip if .log file already exists")
+    parser.add_argument("--archive", help="Read prefix_*.xyz from a tar or zip archive or a sharded directory written by separate-xyz.py")
+    parser.add_argument("--dedup", type=float, metavar="RMSD",
+                        help="Drop near-duplicate geometries within this best-fit RMSD in Angstrom, keeping the "
+                             "lowest-energy one of each set, before any input is written")
+    parser.add_argument("--heavy", action="store_true", help="Only compare heavy atoms for --dedup")
     args = parser.parse_args()
 
-    xyz_files = sorted(glob.glob(f"{args.prefix}_*.xyz"))
+    pattern = f"{args.prefix}_*.xyz"
+    if args.archive:
+        xyz_files = list(iter_xyz_members(args.archive, pattern))
+    else:
+        xyz_files = [(name, None) for name in sorted(glob.glob(pattern))]
     if not xyz_files:
         print("❌ No matching XYZ files found.")
         return
 
-    for xyz_file in xyz_files:
+    if args.dedup is not None:
+        count = len(xyz_files)
+        xyz_files = drop_near_duplicates(xyz_files, args.dedup, args.heavy)
+        print(f"🧹 Dropped {count - len(xyz_files)} near-duplicate conformers, {len(xyz_files)} left")
+
+    for xyz_file, xyz_text in xyz_files:
         base = os.path.splitext(xyz_file)[0]
         inp_file = f"{base}.inp"
         log_file = f"{base}.log"
@@ -81,7 +127,8 @@ def main():
             inp_file,
             solvent=args.solvent,
             charge=args.charge,
-            multiplicity=args.multiplicity
+            multiplicity=args.multiplicity,
+            xyz_text=xyz_text
         )
 
         if success:
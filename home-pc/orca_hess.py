@@ -0,0 +1,203 @@
+"""
+Reader for ORCA .hess files and fast vibrational re-analysis.
+
+The Hessian, masses, coordinates and dipole derivatives of a finished
+frequency job are enough to get frequencies, normal modes and IR intensities
+for any other set of masses or scaling factor, without running the frequency
+job again.
+"""
+import mmap
+import os
+import re
+
+import numpy as np
+
+# CODATA 2018
+HARTREE_J = 4.3597447222071e-18
+BOHR_M = 5.29177210903e-11
+AMU_KG = 1.66053906660e-27
+C_CM_S = 2.99792458e10
+AVOGADRO = 6.02214076e23
+
+# sqrt(Eh / (bohr² amu)) in cm⁻¹
+AU_TO_WAVENUMBER = np.sqrt(HARTREE_J / (BOHR_M ** 2 * AMU_KG)) / (2 * np.pi * C_CM_S)
+
+# (e / sqrt(amu))² in km/mol: N_A π / (3 c² 4πε0), with 4πε0 c² = 1e7 in SI
+IR_AU_TO_KM_MOL = AVOGADRO * np.pi / 3e7 * (1.602176634e-19 ** 2 / AMU_KG) / 1e3
+
+section_re = re.compile(rb"^\$(\w+)[ \t]*\r?$", re.MULTILINE)
+
+
+def content_lines(text):
+    """Non-blank lines of a section, without ORCA's '#' comment lines."""
+    return [line for line in text.split(b"\n") if line.strip() and not line.lstrip().startswith(b"#")]
+
+
+def read_sections(filename):
+    """Raw text of every $section of a .hess file, keyed by section name."""
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            marks = list(section_re.finditer(mm))
+            sections = {}
+            for mark, following in zip(marks, marks[1:] + [None]):
+                end = following.start() if following else len(mm)
+                sections[mark.group(1).decode()] = mm[mark.end():end]
+    return sections
+
+
+def parse_blocked_matrix(text):
+    """
+    Parse ORCA's column-blocked matrix layout: a line with the dimensions,
+    then blocks of a column-index header followed by one row per matrix row.
+    Every block is converted with a single NumPy call.
+    """
+    lines = content_lines(text)
+    dims = [int(x) for x in lines[0].split()]
+    nrows, ncols = dims[0], dims[-1]
+    matrix = np.empty((nrows, ncols))
+
+    i = 1
+    filled = 0
+    while filled < ncols:
+        columns = [int(x) for x in lines[i].split()]
+        rows = lines[i + 1:i + 1 + nrows]
+        block = np.array(b" ".join(rows).split(), dtype=float).reshape(nrows, len(columns) + 1)
+        matrix[:, columns[0]:columns[0] + len(columns)] = block[:, 1:]
+        filled += len(columns)
+        i += 1 + nrows
+    return matrix
+
+
+def parse_table(text, ncols):
+    """Parse a section whose first line is a row count followed by plain rows."""
+    lines = content_lines(text)
+    n = int(lines[0].split()[0])
+    tokens = b" ".join(lines[1:1 + n]).split()
+    return np.array(tokens).reshape(n, ncols)
+
+
+def load_hess(filename, cache=False):
+    """
+    Load a .hess file into NumPy arrays.
+
+    Returns a dict with "hessian" (3N, 3N) in Eh/bohr², "symbols", "masses"
+    in amu, "coords" (N, 3) in bohr and, when present, "frequencies",
+    "normal_modes" and "dipole_derivatives" (3N, 3) in atomic units.
+
+    With cache=True the parsed Hessian is saved next to the file as
+    <file>.npy and memory-mapped on later loads, which avoids parsing the
+    text of large systems again.
+    """
+    sections = read_sections(filename)
+    data = {}
+
+    atoms = parse_table(sections["atoms"], 5)
+    data["symbols"] = atoms[:, 0].astype(str)
+    data["masses"] = atoms[:, 1].astype(float)
+    data["coords"] = atoms[:, 2:].astype(float)
+
+    cache_file = filename + ".npy"
+    if cache and os.path.exists(cache_file) and os.path.getmtime(cache_file) >= os.path.getmtime(filename):
+        data["hessian"] = np.load(cache_file, mmap_mode="r")
+    else:
+        data["hessian"] = parse_blocked_matrix(sections["hessian"])
+        if cache:
+            np.save(cache_file, data["hessian"])
+
+    if "vibrational_frequencies" in sections:
+        data["frequencies"] = parse_table(sections["vibrational_frequencies"], 2)[:, 1].astype(float)
+    if "normal_modes" in sections:
+        data["normal_modes"] = parse_blocked_matrix(sections["normal_modes"])
+    if "dipole_derivatives" in sections:
+        data["dipole_derivatives"] = parse_table(sections["dipole_derivatives"], 3).astype(float)
+    return data
+
+
+def trans_rot_basis(masses, coords):
+    """
+    Orthonormal mass-weighted vectors spanning translations and rotations,
+    shape (3N, 6), or (3N, 5) for linear molecules.
+    """
+    sqrt_m = np.sqrt(masses)
+    centered = coords - (masses[:, None] * coords).sum(axis=0) / masses.sum()
+    vectors = []
+    for axis in np.eye(3):
+        vectors.append((sqrt_m[:, None] * axis).ravel())
+    for axis in np.eye(3):
+        vectors.append((sqrt_m[:, None] * np.cross(axis, centered)).ravel())
+    u, s, _ = np.linalg.svd(np.array(vectors).T, full_matrices=False)
+    return u[:, s > 1e-6 * s.max()]
+
+
+def vibrational_analysis(hessian, masses, coords, dipole_derivatives=None, scale=1.0):
+    """
+    Frequencies (cm⁻¹), Cartesian normal modes and IR intensities (km/mol).
+
+    The Hessian is mass-weighted with `masses`, translations and rotations
+    are projected out, and the remaining internal space is diagonalized.
+    Like ORCA, the 6 (5 for linear molecules) external modes come first with
+    zero frequency and imaginary modes are reported as negative numbers.
+    Intensities are None without dipole derivatives.
+    """
+    masses = np.asarray(masses, dtype=float)
+    inv_sqrt_m = 1.0 / np.sqrt(np.repeat(masses, 3))
+    h_mw = np.asarray(hessian) * inv_sqrt_m[:, None] * inv_sqrt_m[None, :]
+
+    external = trans_rot_basis(masses, coords)
+    nexternal = external.shape[1]
+    q, _ = np.linalg.qr(external, mode="complete")
+    internal = q[:, nexternal:]
+
+    eigvals, eigvecs = np.linalg.eigh(internal.T @ h_mw @ internal)
+    mw_modes = np.zeros((len(inv_sqrt_m), len(inv_sqrt_m)))
+    mw_modes[:, nexternal:] = internal @ eigvecs
+
+    freqs = np.zeros(len(inv_sqrt_m))
+    freqs[nexternal:] = np.sign(eigvals) * np.sqrt(np.abs(eigvals)) * AU_TO_WAVENUMBER * scale
+
+    # Cartesian displacements, normalized like ORCA's $normal_modes
+    modes = mw_modes * inv_sqrt_m[:, None]
+    norms = np.linalg.norm(modes, axis=0)
+    modes[:, nexternal:] /= norms[nexternal:]
+
+    intensities = None
+    if dipole_derivatives is not None:
+        # dμ/dQ for mass-weighted normal coordinates, in e/sqrt(amu)
+        dmu_dq = np.asarray(dipole_derivatives).T @ (mw_modes * inv_sqrt_m[:, None])
+        intensities = IR_AU_TO_KM_MOL * (dmu_dq ** 2).sum(axis=0)
+    return freqs, modes, intensities
+
+
+def substitute_masses(symbols, masses, substitutions):
+    """
+    Copy of `masses` with substitutions applied. Keys are either 0-based atom
+    indices or element symbols (applied to every atom of that element).
+    """
+    masses = np.array(masses, dtype=float)
+    for key, mass in substitutions.items():
+        if isinstance(key, int) or str(key).isdigit():
+            masses[int(key)] = mass
+        else:
+            masses[np.asarray(symbols) == key] = mass
+    return masses
+
+
+def parse_mass_args(values):
+    """Turn command-line items like "H=2.014" or "5=13.003" into a dict."""
+    substitutions = {}
+    for item in values or []:
+        key, _, mass = item.partition("=")
+        substitutions[int(key) if key.isdigit() else key] = float(mass)
+    return substitutions
+
+
+def hess_ir_spectrum(filename, substitutions=None, scale=1.0):
+    """Frequencies and IR intensities of the vibrational modes of a .hess file."""
+    hess = load_hess(filename)
+    if "dipole_derivatives" not in hess:
+        raise RuntimeError(f"❌ {filename} has no $dipole_derivatives section")
+    masses = substitute_masses(hess["symbols"], hess["masses"], substitutions or {})
+    freqs, _, intensities = vibrational_analysis(
+        hess["hessian"], masses, hess["coords"], hess["dipole_derivatives"], scale=scale)
+    vib = freqs != 0
+    return freqs[vib], intensities[vib]
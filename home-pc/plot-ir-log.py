@@ -1,48 +1,39 @@
 #!/usr/bin/env python3
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.stats import norm
 import argparse
-import re
 import os
 
-def extract_ir_data_from_log(filename):
-    with open(filename, 'r') as f:
-        content = f.read()
+from orca_hess import hess_ir_spectrum, parse_mass_args
+from log_cache import cached_scan, open_cache
+from spectra import adaptive_grid, backends, grid_modes, shapes, to_uniform
+from spectrum_cache import SPECTRUM_CACHE_DIR, cached_broaden
 
-    # Try to isolate the "IR SPECTRUM" block
-    ir_block_match = re.search(r"IR SPECTRUM\s+-+\s+Mode\s+freq.+?\n(-+\n)(.*?)(?=\n\n|\Z)", content, re.DOTALL)
-    if not ir_block_match:
-        print("⚠️  Could not locate IR SPECTRUM block.")
-        return [], []
-
-    ir_block = ir_block_match.group(2)
+def extract_ir_data_from_log(filename, cache=None):
+    log = cached_scan(filename, cache, start="IR SPECTRUM")
+    frequencies = log["IR Frequencies"]
+    intensities = log["IR Intensities"]
 
-    # Try matching lines like: "  6:    391.33   0.000000    0.00  ..."
-    pattern = re.compile(r"\d+:\s+([0-9.]+)\s+[0-9.Ee+-]+\s+([0-9.Ee+-]+)")
-    matches = pattern.findall(ir_block)
-
-    if not matches:
-        print("⚠️  IR SPECTRUM block found, but no vibrational data matched.")
-        print("🔍 Block contents:\n", ir_block[:500])
+    if not frequencies:
+        print("⚠️  Could not locate vibrational data in an IR SPECTRUM block.")
         return [], []
 
-    frequencies = [float(m[0]) for m in matches]
-    intensities = [float(m[1]) for m in matches]
-
     print("Extracted Frequencies and Intensities:")
     for f, i in zip(frequencies, intensities):
         print(f"{f:.2f} cm⁻¹  ->  {i:.4f} km/mol")
 
     return frequencies, intensities
 
-def broaden_spectrum(freqs, intensities, fwhm=20.0, resolution=0.5, xrange=(0, 4000)):
-    sigma = fwhm / (2 * np.sqrt(2 * np.log(2)))
-    x = np.arange(xrange[0], xrange[1], resolution)
-    y = np.zeros_like(x)
-    for freq, inten in zip(freqs, intensities):
-        y += inten * norm.pdf(x, freq, sigma)
-    return x, y
+def broaden_spectrum(freqs, intensities, fwhm=20.0, resolution=0.5, xrange=(0, 4000), shape="gaussian", backend="auto",
+                     cache_dir=SPECTRUM_CACHE_DIR, grid="uniform"):
+    # adaptive: points of the uniform grid about fwhm/20 apart near peaks, sparser away from them;
+    # interpolated: those, resampled onto the uniform grid
+    if grid == "uniform":
+        x = np.arange(xrange[0], xrange[1], resolution)
+        return x, cached_broaden(x, freqs, intensities, cache_dir, shape=shape, fwhm=fwhm, backend=backend)
+    x = adaptive_grid(freqs, fwhm, resolution, xrange[0], xrange[1] - resolution)
+    y = cached_broaden(x, freqs, intensities, cache_dir, shape=shape, fwhm=fwhm, backend=backend)
+    return to_uniform(x, y, resolution) if grid == "interpolated" else (x, y)
 
 def plot_spectrum(x, y, title, output_pdf):
     plt.figure(figsize=(6, 4))
@@ -57,14 +48,28 @@ def plot_spectrum(x, y, title, output_pdf):
 
 def main():
     parser = argparse.ArgumentParser(description="Plot IR spectrum from log file with IR SPECTRUM block")
-    parser.add_argument("logfile", help="Log file containing vibrational mode data")
+    parser.add_argument("logfile", help="Log file containing vibrational mode data, or an ORCA .hess file")
     parser.add_argument("--output", help="Output PDF file name")
     parser.add_argument("--title", help="Custom title for the plot")
-    parser.add_argument("--fwhm", type=float, default=20.0, help="FWHM for Gaussian broadening (cm⁻¹)")
+    parser.add_argument("--fwhm", type=float, default=20.0, help="FWHM of the line shape (cm⁻¹)")
+    parser.add_argument("--shape", choices=shapes, default="gaussian", help="Line shape (default: gaussian)")
+    parser.add_argument("--backend", choices=backends, default="auto", help="Broadening backend (default: auto)")
+    parser.add_argument("--grid", choices=grid_modes, default="uniform",
+                        help="uniform: every 0.5 cm⁻¹; adaptive: points about FWHM/20 apart near peaks and sparser in "
+                             "between (smaller files); interpolated: adaptive, then resampled to the uniform grid "
+                             "(default: uniform)")
+    parser.add_argument("--mass", action="append", metavar="ATOM=MASS",
+                        help="With a .hess file: replace a mass by 0-based atom index or element symbol, e.g. H=2.014")
+    parser.add_argument("--scale", type=float, default=1.0, help="With a .hess file: frequency scaling factor")
+    parser.add_argument("--no-cache", action="store_true", help="Parse and broaden again instead of using the caches")
     args = parser.parse_args()
 
-    freqs, intensities = extract_ir_data_from_log(args.logfile)
-    x, y = broaden_spectrum(freqs, intensities, fwhm=args.fwhm)
+    if args.logfile.endswith(".hess"):
+        freqs, intensities = hess_ir_spectrum(args.logfile, parse_mass_args(args.mass), scale=args.scale)
+    else:
+        freqs, intensities = extract_ir_data_from_log(args.logfile, None if args.no_cache else open_cache())
+    x, y = broaden_spectrum(freqs, intensities, fwhm=args.fwhm, shape=args.shape, backend=args.backend,
+                           cache_dir=None if args.no_cache else SPECTRUM_CACHE_DIR, grid=args.grid)
 
     base_name = os.path.splitext(os.path.basename(args.logfile))[0]
     plot_title = args.title if args.title else base_name
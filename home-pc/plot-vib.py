@@ -1,43 +1,9 @@
 #!/usr/bin/env python3
 import numpy as np
 import matplotlib.pyplot as plt
-import re
 import argparse
 
-def parse_log_file(filename):
-    frequencies = []
-    intensities = []
-    with open(filename, 'r') as file:
-        lines = file.readlines()
-
-    start_idx = None
-    for i, line in enumerate(lines):
-        if re.search(r'mode\s+ω/cm⁻¹', line):
-            start_idx = i + 2
-            break
-    
-    if start_idx is None:
-        raise ValueError("Could not find vibrational frequencies table header in the file.")
-    
-    for line in lines[start_idx:]:
-        line = line.strip()
-        if re.match(r'-{5,}', line) or line == '':
-            break
-        
-        parts = line.split()
-        if len(parts) < 5:
-            continue
-        
-        try:
-            freq = float(parts[1])
-            ts_vib = float(parts[-1])
-        except ValueError:
-            continue
-        
-        frequencies.append(freq)
-        intensities.append(abs(ts_vib))
-
-    return frequencies, intensities
+from spectra import FWHM_TO_SIGMA, adaptive_grid, backends, broaden, read_vib_table, shapes
 
 def main():
     parser = argparse.ArgumentParser(description='Plot vibrational spectrum from a log file.')
@@ -45,16 +11,28 @@ def main():
     parser.add_argument('-o', '--output', type=str, default='vibrational_spectrum_from_log.pdf',
                         help='Output filename for the plot (default: vibrational_spectrum_from_log.pdf)')
     parser.add_argument('-w', '--width', type=float, default=5.0,
-                        help='Gaussian broadening width in cm⁻¹ (default: 5.0)')
+                        help='Gaussian broadening width (standard deviation) in cm⁻¹ (default: 5.0)')
+    parser.add_argument('--shape', choices=shapes, default='gaussian', help='Line shape (default: gaussian)')
+    parser.add_argument('--backend', choices=backends, default='auto', help='Broadening backend (default: auto)')
+    parser.add_argument('--grid', choices=['uniform', 'adaptive'], default='adaptive',
+                        help='uniform: every 0.15 cm⁻¹; adaptive: points about FWHM/20 apart near peaks and sparser '
+                             'in between (default: adaptive)')
+    parser.add_argument('--no-show', action='store_true',
+                        help='Only save the figure, without opening a window (for batch jobs and headless nodes)')
     args = parser.parse_args()
 
-    frequencies, intensities = parse_log_file(args.logfile)
-
-    x_vals = np.linspace(0, 300, 2000)
-    spectrum = np.zeros_like(x_vals)
+    frequencies, intensities = read_vib_table(args.logfile)
 
-    for freq, inten in zip(frequencies, intensities):
-        spectrum += inten * np.exp(-((x_vals - freq) ** 2) / (2 * args.width ** 2))
+    # peak heights equal the intensities; the width is the Gaussian standard deviation
+    fwhm = args.width / FWHM_TO_SIGMA
+    # the axis runs to 300 cm⁻¹ or past the highest mode, so no mode is cut off
+    x_max = max(300.0, max(frequencies, default=0.0) + 5 * fwhm)
+    if args.grid == 'adaptive':
+        x_vals = adaptive_grid(frequencies, fwhm, 0.15, 0.0, x_max)
+    else:
+        x_vals = np.arange(0.0, x_max, 0.15)
+    spectrum = broaden(x_vals, frequencies, intensities, args.shape, fwhm,
+                       normalize="height", backend=args.backend)
 
     plt.figure(figsize=(10, 6))
     plt.plot(x_vals, spectrum, color='green')
@@ -64,7 +42,8 @@ def main():
     plt.grid(True, linestyle='--', alpha=0.6)
     plt.tight_layout()
     plt.savefig(args.output, dpi=300)
-    plt.show()
+    if not args.no_show:
+        plt.show()
 
 if __name__ == "__main__":
     main()
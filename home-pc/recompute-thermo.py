@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+import argparse
+import os
+
+from harvest import harvest_logs, walk_logs
+from log_cache import open_cache
+from thermo import molecule_inputs, parse_grid, thermo_grid
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute thermochemistry of ORCA frequency jobs over temperature and pressure grids")
+    parser.add_argument("logs", nargs="*", help="ORCA log files (default: all .log files in the current directory)")
+    parser.add_argument("-T", "--temps", default="298.15", help='Temperatures in K: "298.15", "250,300" or "200:400:50" (default: 298.15)')
+    parser.add_argument("-P", "--pressures", default="1.0", help="Pressures in atm, same syntax as --temps (default: 1.0)")
+    parser.add_argument("--conc", type=float, help="Standard-state concentration in mol/L instead of the ideal gas at each pressure")
+    parser.add_argument("--qrrho", action="store_true", help="Use Grimme's quasi-RRHO entropy for low-frequency modes")
+    parser.add_argument("--cutoff", type=float, default=100.0, help="Quasi-RRHO cutoff frequency in cm⁻¹ (default: 100)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Frequency scaling factor (default: 1.0)")
+    parser.add_argument("-j", "--jobs", type=int, help="Number of parser processes (default: all available cores)")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every log again instead of using the results cache")
+    args = parser.parse_args()
+
+    files = args.logs or walk_logs(".", recursive=False)
+    if not files:
+        print("❌ No .log files found.")
+        return
+
+    cache = None if args.no_cache else open_cache()
+    logs, errors = harvest_logs(files, cache, jobs=args.jobs)
+
+    names, molecules = [], []
+    for f, log in zip(files, logs):
+        if log is None:
+            continue
+        if log["E(electronic)"] is None or not log["Frequencies"] or log["Total Mass"] is None:
+            errors.append((f, "no frequency/thermochemistry data"))
+            continue
+        names.append(os.path.basename(f))
+        molecules.append(molecule_inputs(log))
+
+    if not molecules:
+        print("❌ No logs with thermochemistry data found.")
+        return
+
+    temps = parse_grid(args.temps)
+    pressures = parse_grid(args.pressures)
+    result = thermo_grid(molecules, temps, pressures, qrrho=args.qrrho, cutoff=args.cutoff,
+                         scale=args.scale, concentration=args.conc)
+
+    print("Recomputed Thermochemistry (Eh, tab-separated)")
+    print("\t".join(["File", "T (K)", "P (atm)", "ZPE", "H", "T*S", "G"]))
+    for i, name in enumerate(names):
+        for j, t in enumerate(temps):
+            for k, p in enumerate(pressures):
+                values = [result[key][i, j, k] for key in ("ZPE", "H", "TS", "G")]
+                print("\t".join([name, f"{t:.2f}", f"{p:.3f}"] + [f"{v:.8f}" for v in values]))
+
+    if errors:
+        print(f"\n⚠️ Skipped {len(errors)} file(s):")
+        for f, message in errors:
+            print(f"  {f}: {message}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from harvest import available_cores, harvest_logs
+from log_cache import open_cache
+from orca_hess import hess_ir_spectrum
+from spectra import FWHM_TO_SIGMA, adaptive_grid, read_psi4_ir, read_vib_table, shapes
+from spectrum_cache import SPECTRUM_CACHE_DIR, cached_broaden
+
+# the broadening, grid and look of the single-file scripts, per kind of input
+ir_style = {
+    "figsize": (6, 4), "line": {"color": "black", "linewidth": 1.5}, "grid": {"linestyle": ":", "alpha": 0.5},
+    "xlabel": "Wavenumber (cm⁻¹)", "ylabel": "IR Intensity (km/mol)", "dpi": None,
+    "shape": "gaussian", "fwhm": 20.0, "normalize": "area",
+}
+kinds = {
+    "sticks": dict(ir_style, ylabel="IR Intensity (a.u.)"),                  # plot-ir.py
+    "orca": ir_style,                                                         # plot-ir-log.py
+    "hess": ir_style,                                                         # plot-ir-log.py with a .hess file
+    "psi4": {                                                                 # make-spectra.py
+        "figsize": (4, 3), "line": {}, "grid": None,
+        "xlabel": "Wavenumber (cm⁻¹)", "ylabel": "Intensity (arb. units)", "dpi": None,
+        "shape": "lorentzian", "fwhm": 20.0, "normalize": "area",
+    },
+    "vib": {                                                                  # plot-vib.py
+        "figsize": (10, 6), "line": {"color": "green"}, "grid": {"linestyle": "--", "alpha": 0.6},
+        "xlabel": "Frequency (cm⁻¹)", "ylabel": "Intensity (arb. units)", "dpi": 300,
+        "shape": "gaussian", "fwhm": 5.0 / FWHM_TO_SIGMA, "normalize": "height",
+    },
+}
+
+def guess_kind(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".hess":
+        return "hess"
+    if ext in (".dat", ".txt", ".csv"):
+        return "sticks"
+    return "orca"
+
+def read_sticks(kind, filename):
+    if kind == "sticks":
+        data = np.loadtxt(filename, ndmin=2)
+        return data[:, 0], data[:, 1]
+    if kind == "hess":
+        return hess_ir_spectrum(filename)
+    if kind == "psi4":
+        return read_psi4_ir(filename)
+    if kind == "vib":
+        return read_vib_table(filename)
+    raise RuntimeError(f"❌ Unknown input kind: {kind}")
+
+def spectrum_grid(kind, freqs, fwhm):
+    if kind == "psi4":
+        return np.linspace(min(freqs) - 100, max(freqs) + 100, 5000)
+    if kind == "vib":
+        # as plot-vib.py: from 0 to past the highest mode, sparse away from the peaks
+        return adaptive_grid(freqs, fwhm, 0.15, 0.0, max(300.0, max(freqs) + 5 * fwhm))
+    return np.arange(0, 4000, 0.5)
+
+def output_paths(inputs, outdir, fmt):
+    """
+    Output file of every input: its directory relative to the common root
+    of all inputs, mirrored under `outdir`. Inputs that would still share an
+    output (a.log and a.hess side by side) get a numbered suffix.
+    """
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in inputs]) if inputs else ""
+    outputs, taken = [], set()
+    for f in inputs:
+        folder = os.path.relpath(os.path.dirname(os.path.abspath(f)), root)
+        stem = os.path.join(outdir, folder, os.path.splitext(os.path.basename(f))[0])
+        output = os.path.normpath(f"{stem}.{fmt}")
+        n = 1
+        while output in taken:
+            n += 1
+            output = os.path.normpath(f"{stem}_{n}.{fmt}")
+        if n > 1:
+            print(f"⚠️ {f} would overwrite another spectrum, writing {output} instead")
+        taken.add(output)
+        outputs.append(output)
+    return outputs
+
+def plot_title(kind, filename):
+    if kind == "psi4":
+        return str(filename)
+    if kind == "vib":
+        return f"Vibrational Spectrum from {filename}"
+    return os.path.splitext(os.path.basename(filename))[0]
+
+# one figure per kind and worker process, reused for every spectrum it draws
+_figures = {}
+
+def figure_for(kind):
+    if kind not in _figures:
+        style = kinds[kind]
+        fig = Figure(figsize=style["figsize"])
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        line, = ax.plot([], [], **style["line"])
+        ax.set_xlabel(style["xlabel"])
+        ax.set_ylabel(style["ylabel"])
+        if style["grid"]:
+            ax.grid(True, **style["grid"])
+        _figures[kind] = fig, ax, line
+    return _figures[kind]
+
+def render_job(job):
+    """Broaden and draw one input; returns (input, output, error message or None)."""
+    kind, filename, sticks, output, shape, fwhm, cache_dir = job
+    style = kinds[kind]
+    try:
+        freqs, intensities = sticks if sticks is not None else read_sticks(kind, filename)
+        if len(freqs) == 0:
+            return filename, output, "no vibrational data"
+        fwhm = fwhm or style["fwhm"]
+        x = spectrum_grid(kind, freqs, fwhm)
+        y = cached_broaden(x, freqs, intensities, cache_dir, shape=shape or style["shape"],
+                           fwhm=fwhm, normalize=style["normalize"])
+
+        fig, ax, line = figure_for(kind)
+        line.set_data(x, y)
+        ax.relim()
+        ax.autoscale_view()
+        ax.set_title(plot_title(kind, filename))
+        fig.tight_layout()
+        fig.savefig(output, dpi=style["dpi"] or "figure")
+    except Exception as e:
+        return filename, output, f"{type(e).__name__}: {e}"
+    return filename, output, None
+
+def main():
+    parser = argparse.ArgumentParser(description="Render many spectra headlessly (Agg) across a process pool")
+    parser.add_argument("inputs", nargs="+", help="Stick files (.dat/.txt/.csv), ORCA logs, .hess files, or the logs given by --kind")
+    parser.add_argument("--kind", choices=["auto"] + list(kinds), default="auto",
+                        help="Input kind, plotted like: sticks plot-ir.py, orca/hess plot-ir-log.py, psi4 make-spectra.py, "
+                             "vib plot-vib.py (default: auto, from the file extension; logs are ORCA logs)")
+    parser.add_argument("--format", default="pdf", help="Output format / file extension (default: pdf)")
+    parser.add_argument("--outdir", default=".",
+                        help="Output directory; inputs from several directories keep their relative paths (default: current)")
+    parser.add_argument("--fwhm", type=float, help="FWHM of the line shape in cm⁻¹ (default: that of the matching script)")
+    parser.add_argument("--shape", choices=shapes, help="Line shape (default: that of the matching script)")
+    parser.add_argument("-j", "--jobs", type=int, help="Number of processes (default: all available cores)")
+    parser.add_argument("--no-cache", action="store_true", help="Parse and broaden again instead of using the caches")
+    args = parser.parse_args()
+
+    os.makedirs(args.outdir, exist_ok=True)
+    cache_dir = None if args.no_cache else SPECTRUM_CACHE_DIR
+    kind_of = [guess_kind(f) if args.kind == "auto" else args.kind for f in args.inputs]
+
+    # ORCA logs are parsed first through the parallel, cached harvester
+    logs = [f for f, kind in zip(args.inputs, kind_of) if kind == "orca"]
+    harvested, errors = harvest_logs(logs, None if args.no_cache else open_cache(), start="IR SPECTRUM", jobs=args.jobs)
+    sticks = {f: (log["IR Frequencies"], log["IR Intensities"]) for f, log in zip(logs, harvested) if log is not None}
+
+    jobs = []
+    outputs = output_paths(args.inputs, args.outdir, args.format)
+    for f, kind, output in zip(args.inputs, kind_of, outputs):
+        if kind == "orca" and f not in sticks:
+            continue
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        jobs.append((kind, f, sticks.get(f), output, args.shape, args.fwhm, cache_dir))
+
+    workers = min(args.jobs or available_cores(), len(jobs))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        results = [render_job(job) for job in jobs]
+
+    errors += [(f, message) for f, _, message in results if message]
+    print(f"✅ Rendered {sum(message is None for *_, message in results)} spectra to {args.outdir}")
+    if errors:
+        print(f"\n⚠️ Skipped {len(errors)} file(s):")
+        for f, message in errors:
+            print(f"  {f}: {message}")
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,67 @@
 #!/usr/bin/env python3
 import argparse
 import os
+import warnings
 
-def split_xyz(input_file, output_prefix="frame", output_dir="."):
-    with open(input_file, 'r') as f:
-        lines = f.readlines()
+from binary_xyz import read_xyzb, xyzb_comments
+from xyz_io import FrameWriter, format_xyz, frame_index, frame_layouts, iter_frame_bytes, select_frames, stream_frames
 
-    i = 0
-    frame = 0
-    while i < len(lines):
-        try:
-            natoms = int(lines[i].strip())
-        except ValueError:
-            print(f"⚠️  Could not read atom count on line {i+1}")
-            break
+def xyzb_frames(input_file, frames=None):
+    # Frames of a binary trajectory are read from the memory map one at a time
+    symbols, coords, energies, sources = read_xyzb(input_file)
+    selected = select_frames(frames or "1-", len(coords))
+    comments = xyzb_comments(energies[selected], [sources[k] for k in selected])
+    for k, comment in zip(selected, comments):
+        yield k, format_xyz(symbols, coords[k], comment).encode()
 
-        end = i + 2 + natoms
-        if end > len(lines):
-            print(f"⚠️  Incomplete frame at line {i+1}")
-            break
+def split_xyz(input_file, output_prefix="frame", output_dir=".", frames=None, layout="files",
+              archive=None, shard_size=1000):
+    if input_file.endswith(".xyzb"):
+        blocks = xyzb_frames(input_file, frames)
+    elif frames:
+        # Selected frames are located through the .idx.npy index, so only they are read
+        offsets = frame_index(input_file)
+        selected = select_frames(frames, len(offsets) - 1)
+        blocks = zip(selected, iter_frame_bytes(input_file, selected, offsets))
+    else:
+        blocks = enumerate(stream_frames(input_file))
 
-        block = lines[i:end]
-        frame += 1
-        fname = os.path.join(output_dir, f"{output_prefix}_{frame:04d}.xyz")
-        with open(fname, 'w') as out:
-            out.writelines(block)
+    if layout in ("tar", "zip"):
+        target = archive or os.path.join(output_dir, f"{output_prefix}.{layout}")
+    else:
+        target = output_dir
 
-        i = end
+    with FrameWriter(target, layout, shard_size) as out:
+        for k, block in blocks:
+            out.write(f"{output_prefix}_{k + 1:04d}.xyz", block)
 
-    print(f"✅ Extracted {frame} frames to '{output_dir}'")
+    print(f"✅ Extracted {out.count} frames to '{target}'")
 
 def main():
     parser = argparse.ArgumentParser(description="Split a trajectory XYZ file into separate per-frame XYZ files.")
-    parser.add_argument("xyz_file", help="Trajectory .xyz file with multiple geometries")
+    parser.add_argument("xyz_file", help="Trajectory .xyz or binary .xyzb file with multiple geometries")
     parser.add_argument("--prefix", default="frame", help="Filename prefix (default: frame)")
     parser.add_argument("--outdir", default=".", help="Output directory (default: current)")
+    parser.add_argument("--frames", help='Frames to extract, 1-based: "1000-1200", "5,9-12", or "1-:50" for every 50th (default: all)')
+    parser.add_argument("--reindex", action="store_true", help="Rebuild the .idx.npy frame index of the trajectory")
+    parser.add_argument("--layout", choices=frame_layouts, default="files",
+                        help="files: one file per frame; shards: subdirectories of --shard-size files; "
+                             "tar/zip: a single archive (default: files)")
+    parser.add_argument("--shard-size", type=int, default=1000, help="Frames per subdirectory with --layout shards (default: 1000)")
+    parser.add_argument("--archive", help="Archive file for --layout tar/zip (default: OUTDIR/PREFIX.tar or .zip)")
     args = parser.parse_args()
 
+    if args.shard_size < 1:
+        parser.error("--shard-size must be at least 1")
     os.makedirs(args.outdir, exist_ok=True)
-    split_xyz(args.xyz_file, args.prefix, args.outdir)
+    if args.reindex and not args.xyz_file.endswith(".xyzb"):
+        frame_index(args.xyz_file, rebuild=True)
+    # problems with the trajectory are reported by the readers as warnings, and printed here
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        split_xyz(args.xyz_file, args.prefix, args.outdir, args.frames, args.layout, args.archive, args.shard_size)
+    for warning in caught:
+        print(f"⚠️  {warning.message}")
 
 if __name__ == "__main__":
     main()
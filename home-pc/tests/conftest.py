@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the scripts import their helper modules as top-level modules from home-pc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
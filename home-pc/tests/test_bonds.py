@@ -0,0 +1,33 @@
+import numpy as np
+
+from bonds import bond_pairs, find_rings, reference_atoms
+
+
+def phenol():
+    """Planar phenol: ring C1-C6, H7-H11 on C2-C6, O12 on C1 with its H13."""
+    angles = np.arange(6) * np.pi / 3
+    ring = np.c_[1.39 * np.cos(angles), 1.39 * np.sin(angles), np.zeros(6)]
+    outward = np.c_[np.cos(angles), np.sin(angles), np.zeros(6)]
+    hydrogens = ring[1:] + 1.08 * outward[1:]
+    oxygen = ring[0] + 1.36 * outward[0]
+    hydroxyl = oxygen + 0.96 * np.array([np.cos(np.pi / 3), np.sin(np.pi / 3), 0.0])
+    symbols = ["C"] * 6 + ["H"] * 5 + ["O", "H"]
+    return symbols, np.vstack([ring, hydrogens, oxygen, hydroxyl])
+
+
+def test_bond_pairs_and_rings():
+    symbols, coords = phenol()
+    pairs = bond_pairs(symbols, coords)
+    assert len(pairs) == 13
+    assert [sorted(ring) for ring in find_rings(pairs, len(symbols))] == [[0, 1, 2, 3, 4, 5]]
+
+
+def test_reference_atoms_prefers_the_heteroatom_bond():
+    symbols, coords = phenol()
+    assert reference_atoms(symbols, coords) == ([0, 1, 2, 3, 4, 5], [11, 12])
+
+
+def test_reference_atoms_takes_pairs_as_a_list():
+    symbols, coords = phenol()
+    pairs = bond_pairs(symbols, coords)
+    assert reference_atoms(symbols, coords, pairs.tolist()) == reference_atoms(symbols, coords, pairs)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from dedup import calibrate_width, lsh_buckets, lsh_projections, near_duplicates
+from rmsd import centered, pairwise_rmsd
+
+THRESHOLD = 0.125
+
+
+def random_rotations(rng, n):
+    q, r = np.linalg.qr(rng.normal(size=(n, 3, 3)))
+    q *= np.sign(np.diagonal(r, axis1=1, axis2=2))[:, None, :]
+    q[np.linalg.det(q) < 0, :, 0] *= -1
+    return q
+
+
+@pytest.fixture(scope="module")
+def ensemble():
+    """30 distinct conformers of 12 atoms, each with 4 planted near-duplicates, randomly moved."""
+    rng = np.random.default_rng(3)
+    distinct = rng.normal(size=(30, 12, 3)) * 1.5
+    # displacements from well inside the threshold to just past it
+    scales = rng.uniform(0.01, 0.09, size=(30, 4, 1, 1))
+    copies = distinct[:, None] + rng.normal(size=(30, 4, 12, 3)) * scales
+    frames = np.concatenate([distinct[:, None], copies], axis=1).reshape(-1, 12, 3)
+    frames = np.einsum("fij,faj->fai", random_rotations(rng, len(frames)), frames) + rng.normal(size=(len(frames), 1, 3))
+    return frames[rng.permutation(len(frames))]
+
+
+def close_pairs(frames):
+    matrix = pairwise_rmsd(frames, jobs=1)
+    i, j = np.nonzero(np.triu(matrix <= THRESHOLD, k=1))
+    return set(zip(i.tolist(), j.tolist())), matrix
+
+
+def test_buckets_recall_every_close_pair(ensemble):
+    expected, matrix = close_pairs(ensemble)
+    # the planted copies give pairs on both sides of the threshold
+    assert len(expected) > 100
+    assert ((matrix > THRESHOLD) & (matrix < 2 * THRESHOLD)).any()
+
+    fit = centered(ensemble)
+    width = calibrate_width(fit, THRESHOLD)
+    candidates = set()
+    for group in lsh_buckets(lsh_projections(fit), width):
+        group = np.sort(group).tolist()
+        candidates.update((a, b) for k, a in enumerate(group) for b in group[k + 1:])
+    assert expected <= candidates
+    # and the buckets still prune most of the n^2 pairs
+    assert len(candidates) < 0.25 * len(ensemble) ** 2 / 2
+
+
+def test_near_duplicates_matches_brute_force(ensemble):
+    _, matrix = close_pairs(ensemble)
+    order = np.random.default_rng(5).permutation(len(ensemble))
+    kept = np.zeros(len(ensemble), dtype=bool)
+    for i in order:
+        kept[i] = not (kept & (matrix[i] <= THRESHOLD)).any()
+
+    np.testing.assert_array_equal(near_duplicates(ensemble, THRESHOLD, order), np.flatnonzero(kept))
+
+
+def test_tight_copies_collapse_to_one_each():
+    rng = np.random.default_rng(4)
+    distinct = rng.normal(size=(20, 10, 3)) * 1.5
+    frames = (distinct[:, None] + rng.normal(scale=0.01, size=(20, 5, 10, 3))).reshape(-1, 10, 3)
+    kept = near_duplicates(frames, THRESHOLD)
+    assert sorted(kept // 5) == list(range(20))
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from rmsd import centered, greedy_clusters, kabsch, pairwise_rmsd, qcp_rmsd, rmsd_to_reference
+
+
+def random_rotations(rng, n):
+    q, r = np.linalg.qr(rng.normal(size=(n, 3, 3)))
+    q *= np.sign(np.diagonal(r, axis1=1, axis2=2))[:, None, :]
+    q[np.linalg.det(q) < 0, :, 0] *= -1
+    return q
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
+
+
+def kabsch_matrix(frames):
+    matrix = np.array([rmsd_to_reference(frame, frames) for frame in frames])
+    np.fill_diagonal(matrix, 0.0)  # sqrt of a rounding error, about 1e-8
+    return matrix
+
+
+def test_qcp_matches_kabsch_on_random_frames(rng):
+    A = centered(rng.normal(size=(6, 15, 3)) * 2.0)
+    B = centered(rng.normal(size=(9, 15, 3)) * 2.0)
+    expected = np.array([kabsch(a, B)[1] for a in A])
+    np.testing.assert_allclose(qcp_rmsd(A, B), expected, rtol=0, atol=1e-12)
+
+
+def test_qcp_on_rotated_and_mirrored_frames(rng):
+    frame = rng.normal(size=(12, 3))
+    rotated = np.einsum("fij,aj->fai", random_rotations(rng, 5), frame) + rng.normal(size=(5, 1, 3))
+    mirrored = rotated * [1.0, 1.0, -1.0]
+    frames = centered(np.concatenate([frame[None], rotated, mirrored]))
+
+    rmsd = qcp_rmsd(frames[:1], frames)[0]
+    np.testing.assert_allclose(rmsd[:6], 0.0, atol=1e-6)
+    # a mirror image cannot be rotated onto the frame, and neither QCP nor Kabsch tries
+    np.testing.assert_allclose(rmsd, kabsch(frames[0], frames)[1], rtol=0, atol=1e-6)
+    assert (rmsd[6:] > 0.1).all()
+
+
+def test_pairwise_identical_frames(rng):
+    frames = np.repeat(rng.normal(size=(1, 10, 3)), 5, axis=0)
+    np.testing.assert_allclose(pairwise_rmsd(frames, jobs=1), 0.0, atol=1e-6)
+
+
+@pytest.mark.parametrize("block", [1, 3, 4, 7, 512])
+def test_pairwise_block_boundaries(rng, block):
+    frames = rng.normal(size=(7, 9, 3))
+    matrix = pairwise_rmsd(frames, block=block, jobs=1)
+    np.testing.assert_allclose(matrix, kabsch_matrix(frames), rtol=0, atol=1e-10)
+    np.testing.assert_array_equal(matrix, matrix.T)
+    assert (np.diag(matrix) == 0).all()
+
+
+def test_pairwise_process_pool(rng):
+    frames = rng.normal(size=(9, 6, 3))
+    np.testing.assert_array_equal(pairwise_rmsd(frames, block=4, jobs=2), pairwise_rmsd(frames, block=4, jobs=1))
+
+
+def test_pairwise_mask(rng):
+    frames = rng.normal(size=(5, 8, 3))
+    mask = np.array([True, False] * 4)
+    np.testing.assert_allclose(pairwise_rmsd(frames, mask=mask, jobs=1), kabsch_matrix(frames[:, mask]),
+                               rtol=0, atol=1e-10)
+
+
+def test_greedy_clusters(rng):
+    base = rng.normal(size=(3, 10, 3)) * 3.0
+    frames = np.concatenate([base + rng.normal(scale=0.01, size=(4, 1, 10, 3))[k] for k in range(4)])
+    representatives, labels = greedy_clusters(frames, 0.2)
+    assert len(representatives) == 3
+    matrix = kabsch_matrix(frames)
+    assert (matrix[representatives[labels], np.arange(len(frames))] <= 0.2).all()
+    assert (matrix[np.ix_(representatives, representatives)][~np.eye(3, dtype=bool)] > 0.2).all()
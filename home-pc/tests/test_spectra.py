@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from spectra import FWHM_TO_SIGMA, adaptive_grid, broaden, broaden_stack, choose_backend, shapes, to_uniform
+
+# the grid and line width of the plotting scripts
+x = np.arange(0, 4000, 0.5)
+FWHM = 20.0
+
+# largest error against the dense backend, relative to the maximum, as stated in the module docstring
+bounds = {
+    ("gaussian", "window"): 1e-11,
+    ("gaussian", "fft"): 5e-4,
+    ("lorentzian", "window"): 2e-3,
+    ("lorentzian", "fft"): 5e-4,
+    ("voigt", "window"): 2e-3,
+    ("voigt", "fft"): 5e-4,
+}
+
+
+@pytest.fixture(scope="module")
+def sticks():
+    rng = np.random.default_rng(1)
+    return rng.uniform(300, 3700, 600), rng.exponential(40, 600)
+
+
+@pytest.fixture(scope="module")
+def dense(sticks):
+    return {shape: broaden(x, *sticks, shape, FWHM, backend="dense") for shape in shapes}
+
+
+@pytest.mark.parametrize("shape, backend", sorted(bounds))
+def test_backend_error_bounds(sticks, dense, shape, backend):
+    y = broaden(x, *sticks, shape, FWHM, backend=backend)
+    assert np.abs(y - dense[shape]).max() / dense[shape].max() < bounds[shape, backend]
+
+
+@pytest.mark.parametrize("shape", shapes)
+def test_auto(sticks, dense, shape):
+    positions, intensities = sticks
+    # small spectra are exact
+    np.testing.assert_array_equal(broaden(x, positions[:5], intensities[:5], shape, FWHM),
+                                  broaden(x, positions[:5], intensities[:5], shape, FWHM, backend="dense"))
+    # large Gaussian spectra take the window, whatever the grid
+    expected = "window" if shape == "gaussian" else "fft"
+    assert choose_backend(x, len(positions), shape, "auto") == expected
+    y = broaden(x, *sticks, shape, FWHM)
+    assert np.abs(y - dense[shape]).max() / dense[shape].max() < bounds[shape, expected]
+
+
+@pytest.mark.parametrize("shape", shapes)
+@pytest.mark.parametrize("backend", ["auto", "dense", "window", "fft"])
+def test_stack_matches_rows(shape, backend):
+    rng = np.random.default_rng(2)
+    positions = [rng.uniform(300, 3700, n) for n in (1, 40, 250, 0)]
+    intensities = [rng.exponential(40, len(p)) for p in positions]
+    stack = broaden_stack(x, positions, intensities, shape, FWHM, backend=backend)
+    rows = [broaden(x, p, i, shape, FWHM, backend=backend) for p, i in zip(positions, intensities)]
+    assert stack.shape == (4, len(x))
+    np.testing.assert_allclose(stack, rows, rtol=0, atol=1e-12 * max(np.max(rows), 1.0))
+
+
+@pytest.mark.parametrize("shape", shapes)
+def test_normalization(shape):
+    fine = np.arange(-20000, 20000, 0.25)
+    area = broaden(fine, [0.0], [3.0], shape, FWHM, normalize="area").sum() * 0.25
+    assert area == pytest.approx(3.0, rel=2e-3)
+    assert broaden(fine, [0.0], [3.0], shape, FWHM, normalize="height").max() == pytest.approx(3.0)
+
+def test_adaptive_grid_is_exact_on_its_points(sticks, dense):
+    positions, intensities = sticks
+    grid = adaptive_grid(positions, FWHM, 0.5, 0.0, 3999.5)
+    assert len(grid) < len(x)
+    np.testing.assert_allclose(grid, x[np.searchsorted(x, grid - 0.25)], atol=1e-9)
+    y = broaden(grid, positions, intensities, "gaussian", FWHM, backend="dense")
+    uniform_x, uniform_y = to_uniform(grid, y, 0.5)
+    np.testing.assert_allclose(uniform_x, x, atol=1e-9)
+    assert np.abs(uniform_y - dense["gaussian"]).max() / dense["gaussian"].max() < 1e-4
+
+
+@pytest.mark.parametrize("fwhm, step", [(FWHM, 0.5), (5.0 / FWHM_TO_SIGMA, 0.15)])  # plot-ir, plot-vib
+def test_adaptive_grid_spacing(fwhm, step):
+    grid = adaptive_grid([1000.0, 1600.0], fwhm, step, 0.0, 3000.0)
+    spacing = np.diff(grid)
+    # about fwhm/20 near the peaks, as the --grid help says, rounded down to the lattice
+    assert spacing.min() == pytest.approx(step * max(1, int(fwhm / (20 * step))))
+    assert spacing.min() <= fwhm / 20
+    assert spacing.max() <= fwhm + step
+    near = np.abs(grid[:-1] - 1000.0) < fwhm
+    assert spacing[near].max() == pytest.approx(spacing.min())
@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pytest
+
+from spectrum_cache import cache_entries, cached_broaden, evict, store_spectrum
+
+x = np.arange(0, 4000, 0.5)
+positions, intensities = [1000.0, 1650.0, 3100.0], [10.0, 30.0, 5.0]
+
+
+def test_hit_returns_the_stored_curve(tmp_path):
+    cache = str(tmp_path / "cache")
+    first = cached_broaden(x, positions, intensities, cache, shape="gaussian", fwhm=20.0)
+    assert len(cache_entries(cache)) == 1
+    np.testing.assert_array_equal(cached_broaden(x, positions, intensities, cache, shape="gaussian", fwhm=20.0), first)
+    cached_broaden(x, positions, intensities, cache, shape="lorentzian", fwhm=20.0)
+    assert len(cache_entries(cache)) == 2
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache = str(tmp_path / "cache")
+    for k in range(3):
+        store_spectrum(f"key{k}", x, x, cache)
+        path = os.path.join(cache, f"key{k}.npy")
+        os.utime(path, (1000 + k, 1000 + k))
+    size = os.path.getsize(path)
+    assert evict(cache, 2 * size) == 1
+    assert sorted(os.path.basename(p) for *_, p in cache_entries(cache)) == ["key1.npy", "key2.npy"]
+
+
+def test_unwritable_cache_falls_back_to_broadening(tmp_path, monkeypatch):
+    cache = str(tmp_path / "cache")
+    expected = cached_broaden(x, positions, intensities, None, shape="gaussian", fwhm=20.0)
+
+    def full_disk(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(np, "save", full_disk)
+    y = cached_broaden(x, positions, intensities, cache, shape="gaussian", fwhm=20.0)
+    np.testing.assert_array_equal(y, expected)
+    # no temporary file is left behind
+    assert os.listdir(cache) == []
+
+
+@pytest.mark.skipif(os.geteuid() == 0, reason="root can write to read-only directories")
+def test_read_only_directory(tmp_path):
+    os.chmod(tmp_path, 0o500)
+    try:
+        assert not store_spectrum("key", x, x, str(tmp_path / "cache"))
+    finally:
+        os.chmod(tmp_path, 0o700)
+
+
+def test_cache_path_is_a_file(tmp_path):
+    blocker = tmp_path / "cache"
+    blocker.write_text("not a directory")
+    y = cached_broaden(x, positions, intensities, str(blocker), shape="gaussian", fwhm=20.0)
+    assert y.max() > 0
@@ -0,0 +1,143 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+from xyz_io import (FrameWriter, fixed_layout, frame_index, iter_frame_bytes, parse_fixed_width, parse_xyz, read_xyz_range,
+                    select_frames, stream_frames)
+
+
+def xyz_text(symbols, frames, line_format):
+    text = ""
+    for frame in frames:
+        text += f"{len(symbols)}\ncomment\n"
+        text += "".join(line_format.format(s, *xyz) for s, xyz in zip(symbols, frame))
+    return text.encode()
+
+
+def loadtxt_coords(data, natoms):
+    """Reference: every atom line through np.loadtxt."""
+    lines = data.decode().splitlines()
+    frame_lines = natoms + 2
+    atoms = [line for i, line in enumerate(lines) if i % frame_lines >= 2]
+    return np.loadtxt(io.StringIO("\n".join(atoms)), usecols=(1, 2, 3), ndmin=2).reshape(-1, natoms, 3)
+
+
+def byte_matrix(lines):
+    return np.frombuffer(b"".join(lines), dtype=np.uint8).reshape(len(lines), -1)
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    return rng.uniform(-50, 50, size=(3, 7, 3))
+
+
+symbols = ["C", "H", "O", "N", "Cl", "H", "C"]
+
+
+@pytest.mark.parametrize("line_format", [
+    "{:<2} {:14.8f} {:14.8f} {:14.8f}\n",           # the usual fixed layout, negative signs included
+    "{:<2} {:10.4f} {:16.10f} {:8.3f}\n",           # columns of different widths
+    "{:>3}{:12.6f}{:12.6f}{:12.6f}\n",              # no blank column after the symbol
+])
+def test_fixed_width_matches_loadtxt(frames, line_format):
+    data = xyz_text(symbols, frames, line_format)
+    _, coords, _ = parse_xyz(data)
+    np.testing.assert_allclose(coords, loadtxt_coords(data, len(symbols)), rtol=0, atol=1e-12)
+
+
+def test_fixed_layout_columns():
+    lines = [b"C    -1.500000   12.250000    0.000100", b"H     0.500000   -2.000000  -10.000000"]
+    layout = fixed_layout(byte_matrix(lines))
+    assert [line[dot] for line in lines for _, dot, _ in layout] == [ord(".")] * 6
+    np.testing.assert_array_equal(parse_fixed_width(byte_matrix(lines)),
+                                  [[-1.5, 12.25, 0.0001], [0.5, -2.0, -10.0]])
+
+
+def test_ragged_columns_fall_back_to_loadtxt(frames):
+    data = xyz_text(symbols, frames, "{} {} {} {}\n")
+    _, coords, _ = parse_xyz(data)
+    np.testing.assert_array_equal(coords, loadtxt_coords(data, len(symbols)))
+
+
+def test_unaligned_decimal_points_are_not_fixed_width():
+    lines = [b"C  1.500  22.25 3.0", b"H  12.50  2.250 4.0"]
+    assert parse_fixed_width(byte_matrix(lines)) is None
+
+
+def test_exponents_are_not_fixed_width():
+    lines = [b"C  1.500e+00  2.250  3.000", b"H  2.500e-01  4.000  5.000"]
+    assert parse_fixed_width(byte_matrix(lines)) is None
+
+
+def test_later_frame_breaking_the_layout():
+    # the layout is guessed from the first 4096 lines; the last frame moves its decimal points
+    natoms = 2100
+    rng = np.random.default_rng(1)
+    frames = rng.uniform(-9, 9, size=(3, natoms, 3))
+    data = xyz_text(["C"] * natoms, frames[:2], "{:<2} {:12.6f} {:12.6f} {:12.6f}\n")
+    data += xyz_text(["C"] * natoms, frames[2:], "{:<2} {:10.3f} {:14.7f} {:12.6f}\n")
+    _, coords, _ = parse_xyz(data)
+    np.testing.assert_allclose(coords, loadtxt_coords(data, natoms), rtol=0, atol=1e-12)
+
+
+def test_frame_index_rebuilt_after_rewrite_with_older_mtime(tmp_path):
+    path = str(tmp_path / "t.xyz")
+    with open(path, "wb") as f:
+        f.write(xyz_text(["C", "H"], np.zeros((3, 2, 3)), "{} {:.1f} {:.1f} {:.1f}\n"))
+    first = np.array(frame_index(path))
+    old = os.stat(path).st_mtime_ns
+
+    # rewritten with other frames but an older mtime, as cp -p or rsync -t leave it
+    with open(path, "wb") as f:
+        f.write(xyz_text(["C"] * 4, np.ones((3, 4, 3)), "{} {:.1f} {:.1f} {:.1f}\n"))
+    os.utime(path, ns=(old - 10**9, old - 10**9))
+
+    offsets = frame_index(path)
+    assert not np.array_equal(offsets, first)
+    assert offsets[-1] == os.path.getsize(path)
+    _, coords, _ = read_xyz_range(path, [1])
+    np.testing.assert_array_equal(coords, np.ones((1, 4, 3)))
+
+
+def test_frame_index_reused_while_unchanged(tmp_path):
+    path = str(tmp_path / "t.xyz")
+    with open(path, "wb") as f:
+        f.write(xyz_text(["C", "H"], np.zeros((3, 2, 3)), "{} {:.1f} {:.1f} {:.1f}\n"))
+    offsets = frame_index(path)
+    assert isinstance(frame_index(path), np.memmap)
+    np.testing.assert_array_equal(frame_index(path), offsets)
+
+
+def test_empty_trajectory(tmp_path):
+    path = str(tmp_path / "empty.xyz")
+    open(path, "wb").close()
+    offsets = frame_index(path)
+    assert offsets.tolist() == [0]
+    assert list(iter_frame_bytes(path, select_frames("1-", len(offsets) - 1))) == []
+
+
+def test_incomplete_frame_is_a_warning(tmp_path):
+    path = str(tmp_path / "t.xyz")
+    data = xyz_text(["C", "H"], np.zeros((2, 2, 3)), "{} {:.1f} {:.1f} {:.1f}\n")
+    with open(path, "wb") as f:
+        f.write(data[:-14])  # the last atom line of frame 2 is missing
+    with pytest.warns(UserWarning, match="Incomplete frame"):
+        assert len(frame_index(path, rebuild=True)) == 2
+    with pytest.warns(UserWarning, match="Incomplete frame"):
+        assert len(list(stream_frames(path))) == 1
+
+
+@pytest.mark.parametrize("shard_size", [0, -5])
+def test_frame_writer_rejects_bad_shard_size(tmp_path, shard_size):
+    with pytest.raises(ValueError, match="shard_size"):
+        FrameWriter(str(tmp_path / "out"), "shards", shard_size)
+
+
+def test_frame_writer_shards(tmp_path):
+    with FrameWriter(str(tmp_path / "out"), "shards", 2) as out:
+        for k in range(5):
+            out.write(f"frame_{k}.xyz", b"1\n\nH 0 0 0\n")
+    assert sorted(os.listdir(tmp_path / "out")) == ["0000", "0001", "0002"]